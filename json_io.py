@@ -0,0 +1,12 @@
+"""
+json_io.py
+==========
+Helper tulis JSON bersama untuk scraper (IDX, Kompas, Pluang) dan menu.py.
+"""
+import orjson
+
+
+def write_json(path: str, data: dict):
+    """Tulis JSON indent 2 (UTF-8 apa adanya) sebagai satu buffer orjson."""
+    with open(path, "wb") as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
@@ -1403,14 +1403,14 @@ def run_scrape_saham():
         
         ok("Memulai scraping data dari Bursa Efek Indonesia (IDX)...")
         from scrape_idx import scrape_idx_all
+        from json_io import write_json
         res = scrape_idx_all()
         if res:
             timestamp = int(time.time())
             save_dir = os.path.join(OUTPUT_DIR, "saham")
             os.makedirs(save_dir, exist_ok=True)
             out_path = os.path.join(save_dir, f"idx_combined_{timestamp}.json")
-            with open(out_path, "w", encoding="utf-8") as f:
-                json.dump(res, f, ensure_ascii=False, indent=2)
+            write_json(out_path, res)
             
             size = round(os.path.getsize(out_path) / 1024, 1)
             show_result("IDX SCRAPE BERHASIL (Metadata + Summary + Broker)", out_path, 1)
@@ -1444,14 +1444,14 @@ def run_scrape_saham():
         # IDX Scraping
         ok("Memulai scraping data dari Bursa Efek Indonesia (IDX)...")
         from scrape_idx import scrape_idx_all
+        from json_io import write_json
         res = scrape_idx_all()
         if res:
             timestamp = int(time.time())
             save_dir = os.path.join(OUTPUT_DIR, "saham")
             os.makedirs(save_dir, exist_ok=True)
             out_path = os.path.join(save_dir, f"idx_combined_{timestamp}.json")
-            with open(out_path, "w", encoding="utf-8") as f:
-                json.dump(res, f, ensure_ascii=False, indent=2)
+            write_json(out_path, res)
             
             size = round(os.path.getsize(out_path) / 1024, 1)
             show_result("IDX SCRAPE BERHASIL (Metadata + Summary + Broker)", out_path, 1)
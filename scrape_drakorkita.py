@@ -10,16 +10,32 @@ Fitur:
 
 import os
 import sys
+import glob
 import re
-import json
 import time
+import random
+import queue
+import sqlite3
+import contextlib
+import itertools
 import logging
-import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+import logging.handlers
+import multiprocessing
+import threading
+import zlib
+import httpx
+import orjson
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 from datetime import datetime
-from urllib.parse import urljoin
-from bs4 import BeautifulSoup
+from urllib.parse import urljoin, urlsplit
+from lxml import etree
+
+try:
+    # selectolax (engine lexbor, C) opsional: parser listing tercepat.
+    # Tanpa selectolax, listing di-parse lewat _ListingTarget (lxml).
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
 
 # ── Setup ────────────────────────────────────────────────────────────────────
 BASE_URL = "https://drakorkita3.nicewap.sbs"
@@ -36,64 +52,432 @@ HEADERS = {
     "Referer": BASE_URL,
 }
 
-SESSION = requests.Session()
-retry_strategy = Retry(
-    total=3,
-    status_forcelist=[429, 500, 502, 503, 504],
-    allowed_methods=["HEAD", "GET", "OPTIONS"],
-    backoff_factor=1
+# Batas request HTTP yang sedang berjalan di seluruh thread (listing + detail).
+# Pool thread boleh lebih besar; kelebihannya menunggu slot di _http_get.
+HTTP_CONCURRENCY = 15
+_HTTP_SLOTS = threading.BoundedSemaphore(HTTP_CONCURRENCY)
+
+# Satu client HTTP/2 keep-alive untuk semua request: koneksi TLS ke host yang
+# sama dipakai ulang (dan di-multiplex) alih-alih handshake baru per halaman.
+# Pool koneksi seukuran HTTP_CONCURRENCY: tiap slot punya koneksi keep-alive
+# sendiri (tidak ada handshake ulang karena pool penuh), dan koneksi idle
+# ditahan 30 detik supaya jeda antar gelombang listing tidak menutupnya.
+# retries=3 di transport hanya mengulang error koneksi; status 429/5xx
+# di-retry oleh _http_get() (pengganti urllib3 Retry di requests).
+SESSION = httpx.Client(
+    headers=HEADERS,
+    timeout=20,
+    follow_redirects=True,
+    transport=httpx.HTTPTransport(
+        http2=True,
+        retries=3,
+        limits=httpx.Limits(
+            max_connections=HTTP_CONCURRENCY,
+            max_keepalive_connections=HTTP_CONCURRENCY,
+            keepalive_expiry=30,
+        ),
+    ),
 )
-adapter = HTTPAdapter(max_retries=retry_strategy)
-SESSION.mount("http://", adapter)
-SESSION.mount("https://", adapter)
-SESSION.headers.update(HEADERS)
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# Laju request maksimum per host (token bucket, menggantikan sleep tetap).
+# Turunkan jika mulai banyak 429; retry 429/5xx di _http_get tetap jadi pengaman.
+MAX_REQUESTS_PER_SECOND = 8
+
+
+class _RateLimiter:
+    """Token bucket thread-safe: rata-rata `rate` request/detik, burst s.d. `burst`."""
+
+    def __init__(self, rate: float, burst: int = None):
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            # Token boleh minus: tiap pemanggil memesan slot waktunya sendiri,
+            # lalu tidur di luar lock
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+        if wait:
+            time.sleep(wait)
+
+
+# Satu bucket per host: request ke domain lain (mirror, CDN) tidak ikut antre
+_RATE_LIMITERS: dict[str, _RateLimiter] = {}
+_RATE_LIMITERS_LOCK = threading.Lock()
+
+
+def _rate_limiter(url: str) -> _RateLimiter:
+    host = urlsplit(url).hostname or ""
+    limiter = _RATE_LIMITERS.get(host)
+    if limiter is None:
+        with _RATE_LIMITERS_LOCK:
+            limiter = _RATE_LIMITERS.setdefault(host, _RateLimiter(MAX_REQUESTS_PER_SECOND))
+    return limiter
+
+# Cache HTTP di disk untuk re-crawl inkremental. Respons yang masih dalam TTL
+# dipakai tanpa request; lewat TTL dikirim conditional GET (ETag /
+# Last-Modified) dan 304 berarti cache dipakai lagi. Jika server error atau
+# tidak terjangkau, salinan basi tetap dipakai.
+HTTP_CACHE_ENABLED = True
+HTTP_CACHE_PATH = os.path.join(OUTPUT_DIR, "http_cache.sqlite")
+LISTING_CACHE_TTL = 3600  # halaman listing: 1 jam tanpa request sama sekali
+# Header yang ikut disimpan (Content-Encoding/Length tidak: konten sudah di-decode)
+_CACHED_HEADERS = ("content-type", "etag", "last-modified")
+
+
+class _HttpCache:
+    """Cache respons GET di sqlite: url → (ts, header, konten terkompresi zlib)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS responses "
+                               "(url TEXT PRIMARY KEY, ts INTEGER, headers TEXT, content BLOB)")
+        return self._conn
+
+    def get(self, url: str) -> tuple[float, httpx.Response] | None:
+        with self._lock:
+            row = self._db().execute("SELECT ts, headers, content FROM responses WHERE url=?",
+                                     (url,)).fetchone()
+        if row is None:
+            return None
+        ts, headers, content = row
+        return ts, httpx.Response(200, headers=orjson.loads(headers), content=zlib.decompress(content),
+                                  request=httpx.Request("GET", url))
+
+    def put(self, url: str, resp: httpx.Response):
+        headers = {k: resp.headers[k] for k in _CACHED_HEADERS if k in resp.headers}
+        row = (url, int(time.time()), orjson.dumps(headers).decode(), zlib.compress(resp.content, 1))
+        with self._lock:
+            self._db().execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)", row)
+            self._db().commit()
+
+    def touch(self, url: str):
+        with self._lock:
+            self._db().execute("UPDATE responses SET ts=? WHERE url=?", (int(time.time()), url))
+            self._db().commit()
+
+
+_HTTP_CACHE = _HttpCache(HTTP_CACHE_PATH)
+
+# Jumlah tab paralel per judul saat klik episode di Playwright (LANGKAH 3)
+EPISODE_TABS = 4
+
+# Chromium yang dipakai ulang di-launch ulang setelah sekian judul (context),
+# supaya memori native yang bocor di proses browser tidak terus menumpuk
+BROWSER_RECYCLE_AFTER = 100
+
+# Domain iklan/pelacak: iframe-nya dianggap bukan video, request-nya diblokir
+AD_DOMAINS = ['dtscout.com', 'doubleclick', 'googlesyndication', 'adnxs.com']
+# Satu regex untuk semua domain: dicek di C tanpa salinan url.lower() per cek
+AD_RE = re.compile("|".join(map(re.escape, AD_DOMAINS)), re.IGNORECASE)
+
+# Jenis resource yang tidak pernah dibaca scraper episode → diblokir di browser
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "stylesheet", "media"})
+# Dipasang di setiap frame (termasuk iframe player): video tidak pernah autoplay,
+# scraper hanya membaca iframe.src
+JS_NO_AUTOPLAY = "HTMLMediaElement.prototype.play = () => Promise.resolve();"
+
+# Manifest detail yang sudah di-scrape (LANGKAH 2). Judul yang di-scrape kurang
+# dari MANIFEST_TTL detik lalu dipakai ulang dari manifest tanpa request baru,
+# sehingga run ulang setelah crash/putus jaringan tidak mulai dari nol.
+MANIFEST_PATH = os.path.join(OUTPUT_DIR, "manifest.sqlite")
+MANIFEST_TTL = 86400
+
+# Snapshot hasil LANGKAH 3 ditulis (di thread I/O) setiap N judul selesai
+CHECKPOINT_EVERY = 100
+# File per run yang dibaca --resume (<stem> = drakorkita_full_<ts>): file full
+# final ({"metadata", "dramas"}), atau sisa run yang crash sebelum file full
+# ditulis: checkpoint (list detail), detail LANGKAH 2 (.jsonl) dan episode
+# LANGKAH 3 (.episodes.jsonl)
+RE_RUN_FILE = re.compile(r"drakorkita_full_(\d+)\.(json|checkpoint\.json|jsonl|episodes\.jsonl)")
+
+# Regex yang dipakai parser listing/detail untuk setiap halaman — compile sekali saja
+RE_DURATION = re.compile(r"^\d{1,2}:\d{2}(:\d{2})?$")     # "1:09:03", "47:04"
+RE_RATING_NUM = re.compile(r"^\d\.?\d?$")                 # rating card listing: "8.7"
+SUBS_ID_SUFFIX = "Subtitle Indonesia"
+RE_CAST_AS = re.compile(r"(\w)(as )([A-Z])")               # "Jin-hyukas Kang" → "Jin-hyuk as Kang"
+RE_SINOPSIS = re.compile(r"Sinopsis", re.I)
+RE_SCORE = re.compile(r"Score\s*:", re.I)
+RE_SCORE_NUM = re.compile(r"[\d.]+")
+RE_RATING = re.compile(r"(\d+)\s*Rating", re.I)
+RE_EP_RANGE = re.compile(r"Episode\s+\d+\s*-\s*(\d+)", re.I)
+RE_DIGIT = re.compile(r"\d+")
+# Label span " : " yang bukan field info (fallback tanpa .anf)
+INFO_SKIP_KEYS = frozenset({"sinopsis", "informasi"})
+
+# Link pagination di halaman listing (<a href="...?page=N">); dibaca langsung
+# dari bytes agar tidak perlu parse ulang. "&amp;page=" juga tertangkap lewat ';'.
+RE_PAGE_LINK = re.compile(rb"""<a\b[^>]*?href=["'][^"']*[?&;]page=(\d+)""", re.I)
+
+# Jumlah halaman listing yang di-fetch bersamaan (LANGKAH 1)
+LISTING_WORKERS = 8
+# Halaman yang ≥ sekian persen judulnya sudah terlihat dianggap daur ulang
+# halaman terakhir (situs yang tidak mengembalikan halaman kosong) → berhenti
+LISTING_DUP_STOP = 0.95
+
+
+def _backoff_delay(attempt: int, base: float = 1.0, cap: float = 30.0,
+                   jitter: float = 0.5) -> float:
+    """Exponential backoff + jitter: base·2^attempt·(1..1+jitter) detik, maks `cap`.
+    Jitter memencarkan retry dari banyak thread supaya tidak serempak."""
+    return min(cap, base * 2 ** attempt * (1 + random.random() * jitter))
+
+
+# Single-flight: URL (+params) yang sedang di-fetch → Future hasilnya
+_INFLIGHT: dict[str, Future] = {}
+_INFLIGHT_LOCK = threading.Lock()
+
+
+def _http_get(url: str, params: dict = None, timeout: float = 20, retries: int = 3,
+              cache_ttl: float = 0) -> httpx.Response:
+    """GET dengan single-flight: jika URL yang sama sedang di-fetch thread lain,
+    tunggu dan pakai respons (atau exception) yang sama, tanpa request kedua.
+    """
+    key = str(httpx.URL(url, params=params))
+    with _INFLIGHT_LOCK:
+        future = _INFLIGHT.get(key)
+        owner = future is None
+        if owner:
+            future = _INFLIGHT[key] = Future()
+    if owner:
+        try:
+            future.set_result(_http_fetch(url, params, timeout, retries, cache_ttl))
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with _INFLIGHT_LOCK:
+                del _INFLIGHT[key]
+    return future.result()
+
+
+def _http_fetch(url: str, params: dict = None, timeout: float = 20, retries: int = 3,
+                cache_ttl: float = 0) -> httpx.Response:
+    """GET via SESSION, retry dengan backoff (±1s, 2s, 4s) untuk status 429/5xx.
+    Slot _HTTP_SLOTS hanya dipegang selama request, tidak selama backoff.
+
+    Dengan HTTP_CACHE_ENABLED: cache lebih muda dari `cache_ttl` detik dipakai
+    langsung; selain itu revalidasi (304 → cache). Respons 200 disimpan jika
+    punya ETag/Last-Modified atau cache_ttl > 0.
+    """
+    cached = None
+    headers = {}
+    if HTTP_CACHE_ENABLED:
+        key = str(httpx.URL(url, params=params))
+        cached = _HTTP_CACHE.get(key)
+        if cached:
+            cached_at, cached_resp = cached
+            if time.time() - cached_at < cache_ttl:
+                return cached_resp
+            if "etag" in cached_resp.headers:
+                headers["If-None-Match"] = cached_resp.headers["etag"]
+            if "last-modified" in cached_resp.headers:
+                headers["If-Modified-Since"] = cached_resp.headers["last-modified"]
+
+    limiter = _rate_limiter(url)
+    try:
+        for attempt in range(retries + 1):
+            limiter.acquire()
+            with _HTTP_SLOTS:
+                resp = SESSION.get(url, params=params, timeout=timeout, headers=headers)
+            if resp.status_code not in RETRY_STATUS or attempt == retries:
+                break
+            time.sleep(_backoff_delay(attempt))
+    except httpx.HTTPError as e:
+        if not cached:
+            raise
+        log.warning(f"  ⚠ {url}: {e} — pakai cache lama")
+        return cached[1]
+
+    if cached and resp.status_code == 304:
+        _HTTP_CACHE.touch(key)
+        return cached[1]
+    if cached and resp.status_code in RETRY_STATUS:
+        log.warning(f"  ⚠ {url}: HTTP {resp.status_code} — pakai cache lama")
+        return cached[1]
+    if (HTTP_CACHE_ENABLED and resp.status_code == 200
+            and (cache_ttl > 0 or "etag" in resp.headers or "last-modified" in resp.headers)):
+        _HTTP_CACHE.put(key, resp)
+    return resp
 
 
 # ══════════════════════════════════════════════════════════════════════════════
 # LANGKAH 1: Crawl daftar film dari /all?page=N
 # ══════════════════════════════════════════════════════════════════════════════
 
+class _ListingTarget:
+    """Target parser lxml (SAX-style) untuk halaman listing.
+
+    Tidak membangun DOM: hanya event di dalam <a href*='/detail/'> yang
+    dicatat. Tiap card menghasilkan dict mentah:
+      href    → atribut href
+      title   → teks elemen judul (.title, h3, h4, .name, .tt) atau None
+      rating  → teks elemen rating (.rtx, .score, .rating) atau None
+      episode → teks elemen episode (.episode, .epx, .ep) atau None
+      texts   → semua text node yang sudah di-strip (= card.stripped_strings)
+      img     → atribut <img> pertama atau None
+    """
+    # field → (tag, class) yang menandai elemennya; elemen pertama yang cocok menang
+    FIELDS = {
+        "title": ({"h3", "h4"}, {"title", "name", "tt"}),
+        "rating": (set(), {"rtx", "score", "rating"}),
+        "episode": (set(), {"episode", "epx", "ep"}),
+    }
+
+    def __init__(self):
+        self.cards = []
+        self._card = None
+        self._buf = []
+        # field yang sedang ditangkap → [kedalaman, potongan teks]
+        self._capture = {}
+
+    def _flush(self):
+        # Batas text node: setiap start/end tag di dalam card
+        if self._buf:
+            txt = "".join(self._buf).strip()
+            self._buf = []
+            if txt:
+                self._card["texts"].append(txt)
+                for cap in self._capture.values():
+                    cap[1].append(txt)
+
+    def start(self, tag, attrib):
+        if self._card is None:
+            if tag == "a" and "/detail/" in attrib.get("href", ""):
+                self._card = {"href": attrib["href"], "title": None, "rating": None,
+                              "episode": None, "texts": [], "img": None}
+            return
+
+        self._flush()
+        for cap in self._capture.values():
+            cap[0] += 1
+        classes = attrib.get("class", "").split()
+        for field, (tags, cls) in self.FIELDS.items():
+            if (self._card[field] is None and field not in self._capture
+                    and (tag in tags or cls.intersection(classes))):
+                self._capture[field] = [1, []]
+        if tag == "img" and self._card["img"] is None:
+            self._card["img"] = dict(attrib)
+
+    def end(self, tag):
+        if self._card is None:
+            return
+
+        self._flush()
+        if tag == "a":
+            self.cards.append(self._card)
+            self._card = None
+            self._capture = {}
+            return
+        for field, cap in list(self._capture.items()):
+            cap[0] -= 1
+            if not cap[0]:
+                self._card[field] = "".join(cap[1])
+                del self._capture[field]
+
+    def data(self, data):
+        if self._card is not None:
+            self._buf.append(data)
+
+    def comment(self, text):
+        if self._card is not None:
+            self._flush()
+
+    def close(self):
+        return self.cards
+
+
+def _listing_cards_selectolax(content: bytes) -> list[dict]:
+    """Ekstrak card listing dengan selectolax; format dict sama dengan _ListingTarget."""
+    cards = []
+    for a in LexborHTMLParser(content).css("a[href*='/detail/']"):
+        title_el = a.css_first("h3, h4, .title, .name, .tt")
+        rating_el = a.css_first(".rtx, .score, .rating")
+        ep_el = a.css_first(".episode, .epx, .ep")
+        img = a.css_first("img")
+        texts = []
+        for node in a.traverse(include_text=True):
+            if node.tag == "-text":
+                txt = node.text(deep=False).strip()
+                if txt:
+                    texts.append(txt)
+        cards.append({
+            "href": a.attributes["href"],
+            "title": None if title_el is None else title_el.text(strip=True),
+            "rating": None if rating_el is None else rating_el.text(strip=True),
+            "episode": None if ep_el is None else ep_el.text(strip=True),
+            "texts": texts,
+            "img": None if img is None else dict(img.attributes),
+        })
+    return cards
+
+
 def fetch_listing_page(page: int = 1, params: dict = None) -> list[dict]:
     """Ambil daftar film dari halaman listing."""
+    return _fetch_listing(page, params)[0]
+
+
+def _fetch_listing(page: int, params: dict = None) -> tuple[list[dict], int]:
+    """Ambil halaman listing → (items, nomor halaman tertinggi di pagination).
+    Nomor halaman 0 berarti halaman tidak punya link pagination.
+    """
     url = f"{BASE_URL}/all"
     p = {"page": page}
     if params:
         p.update(params)
 
     try:
-        resp = SESSION.get(url, params=p, timeout=20)
+        resp = _http_get(url, params=p, timeout=20, cache_ttl=LISTING_CACHE_TTL)
         resp.raise_for_status()
     except Exception as e:
         log.error(f"Gagal fetch listing page {page}: {e}")
-        return []
+        return [], 0
 
-    soup = BeautifulSoup(resp.text, "html.parser")
-    items = []
+    last_page = max((int(n) for n in RE_PAGE_LINK.findall(resp.content)), default=0)
 
-    # Pattern durasi yang harus di-skip (misalnya "1:09:03", "47:04")
-    duration_pattern = re.compile(r'^\d{1,2}:\d{2}(:\d{2})?$')
+    if LexborHTMLParser is not None:
+        cards = _listing_cards_selectolax(resp.content)
+    else:
+        # Stream-parse: lxml memanggil _ListingTarget per event, tanpa membangun DOM
+        parser = etree.HTMLParser(target=_ListingTarget(), encoding=resp.charset_encoding)
+        cards = etree.fromstring(resp.content, parser) or []
+    # Dedup langsung saat iterasi: slug → item (card pertama menang, urutan tetap)
+    items = {}
 
-    # Setiap item ada di <a> dengan href ke /detail/...
-    for card in soup.select("a[href*='/detail/']"):
-        href = card.get("href", "")
-        if "/detail/" not in href:
-            continue
+    for card in cards:
+        href = card["href"]
 
         # Extract slug dari URL
         slug = href.rstrip("/").split("/")[-1]
+        if slug in items:
+            continue
+        all_texts = card["texts"]
 
         # Cari judul — skip teks durasi dan teks pendek
         title_text = ""
-        title_el = card.select_one(".title, h3, h4, .name, .tt")
-        if title_el:
-            title_text = title_el.get_text(strip=True)
+        if card["title"] is not None:
+            title_text = card["title"]
         else:
             # Fallback: ambil teks yang BUKAN durasi dan cukup panjang
-            for txt in card.stripped_strings:
-                txt = txt.strip()
+            for txt in all_texts:
                 # Skip durasi, angka pendek, rating, episode labels
                 if (len(txt) > 5
-                    and not duration_pattern.match(txt)
+                    and not RE_DURATION.match(txt)
                     and not txt.replace(".", "").isdigit()
                     and not txt.startswith("E")
                     and "480p" not in txt and "720p" not in txt
@@ -102,7 +486,7 @@ def fetch_listing_page(page: int = 1, params: dict = None) -> list[dict]:
                     break
 
         # Jika masih tidak ada, buat dari slug
-        if not title_text or duration_pattern.match(title_text):
+        if not title_text or RE_DURATION.match(title_text):
             # "positively-yours-2026-eot" → "Positively Yours 2026"
             parts = slug.split("-")
             # Hapus suffix random (4 char hash setelah tahun)
@@ -112,74 +496,95 @@ def fetch_listing_page(page: int = 1, params: dict = None) -> list[dict]:
 
         # Cari poster image
         poster = ""
-        img = card.select_one("img")
+        img = card["img"]
         if img:
             poster = img.get("data-src") or img.get("src") or ""
             if poster and not poster.startswith("http"):
                 poster = urljoin(BASE_URL, poster)
 
-        # Cari rating — biasanya angka kecil di akhir card
-        rating = ""
-        all_texts = [t.strip() for t in card.stripped_strings]
-        for txt in reversed(all_texts):
-            if re.match(r'^\d\.?\d?$', txt) and float(txt) <= 10:
-                rating = txt
-                break
+        # Cari rating — elemen .rtx/.score/.rating jika ada, selain itu
+        # angka kecil terakhir di card
+        rating = card["rating"] or ""
+        if not (RE_RATING_NUM.match(rating) and float(rating) <= 10):
+            rating = ""
+            for txt in reversed(all_texts):
+                if RE_RATING_NUM.match(txt) and float(txt) <= 10:
+                    rating = txt
+                    break
 
-        # Cari episode info
-        episode_info = ""
-        for txt in all_texts:
-            if txt.startswith("E") and ("/" in txt or "END" in txt):
-                episode_info = txt
-                break
+        # Cari episode info — elemen .episode/.epx/.ep jika ada
+        episode_info = card["episode"] or ""
+        if not episode_info:
+            for txt in all_texts:
+                if txt.startswith("E") and ("/" in txt or "END" in txt):
+                    episode_info = txt
+                    break
 
         # Normalisasi URL
         detail_url = href if href.startswith("http") else urljoin(BASE_URL, href)
 
-        if title_text or slug:
-            items.append({
-                "title": title_text,
-                "slug": slug,
-                "detail_url": detail_url,
-                "poster": poster,
-                "rating": rating,
-                "episode_info": episode_info,
-            })
-
-    # Deduplicate berdasarkan slug
-    seen = set()
-    unique = []
-    for item in items:
-        if item["slug"] not in seen:
-            seen.add(item["slug"])
-            unique.append(item)
+        # Filter /detail/ sudah terjadi di parser (selector CSS / _ListingTarget),
+        # dan title_text selalu terisi (fallback dari slug) → tanpa guard lagi
+        items[slug] = {
+            "title": title_text,
+            "slug": slug,
+            "detail_url": detail_url,
+            "poster": poster,
+            "rating": rating,
+            "episode_info": episode_info,
+        }
 
-    return unique
+    return list(items.values()), last_page
 
 
 def crawl_all_listings(max_pages: int = None, params: dict = None) -> list[dict]:
-    """Crawl semua halaman listing."""
-    all_items = []
-    page = 1
-
-    while True:
-        if max_pages and page > max_pages:
-            break
-
-        log.info(f"📄 Crawling halaman {page}...")
-        items = fetch_listing_page(page, params)
-
-        if not items:
-            log.info(f"  Halaman {page} kosong, selesai.")
-            break
-
-        all_items.extend(items)
-        log.info(f"  → {len(items)} judul ditemukan (total: {len(all_items)})")
-
-        page += 1
-        time.sleep(0.5)  # Sopan, jangan terlalu cepat
-
-    return all_items
+    """Crawl semua halaman listing.
+
+    Halaman 1 di-fetch dulu untuk membaca halaman terakhir dari pagination,
+    lalu halaman 2..N di-fetch paralel. Jika pagination hanya menampilkan
+    sebagian nomor, batas dibaca ulang dari halaman yang baru di-fetch.
+    Tanpa pagination sama sekali, halaman di-probe per gelombang paralel
+    sampai ditemukan halaman kosong, atau halaman yang isinya hampir semua
+    judul yang sudah terlihat (LISTING_DUP_STOP).
+    """
+    log.info(f"📄 Crawling halaman 1...")
+    all_items, last_page = _fetch_listing(1, params)
+    if not all_items:
+        log.info(f"  Halaman 1 kosong, selesai.")
+        return []
+    log.info(f"  → {len(all_items)} judul ditemukan (total: {len(all_items)})")
+    seen = {item["slug"] for item in all_items}
+
+    fetched = 1
+    with ThreadPoolExecutor(max_workers=LISTING_WORKERS) as executor:
+        while True:
+            if last_page:
+                target = min(last_page, max_pages) if max_pages else last_page
+            else:
+                # Batas belum diketahui → probe satu gelombang lagi
+                target = fetched + LISTING_WORKERS
+                if max_pages:
+                    target = min(target, max_pages)
+            if target <= fetched:
+                return all_items
+            # Satu gelombang = LISTING_WORKERS halaman, supaya halaman kosong
+            # di tengah tidak membuat sisa ratusan halaman ikut di-request
+            pages = range(fetched + 1, min(target, fetched + LISTING_WORKERS) + 1)
+            log.info(f"📄 Crawling halaman {pages[0]}-{pages[-1]} (paralel)...")
+            results = executor.map(lambda pg: _fetch_listing(pg, params), pages)
+            for page, (items, linked_page) in zip(pages, results):
+                if not items:
+                    log.info(f"  Halaman {page} kosong, selesai.")
+                    return all_items
+                new = sum(1 for item in items if item["slug"] not in seen)
+                if new < len(items) * (1 - LISTING_DUP_STOP):
+                    log.info(f"  Halaman {page}: judul sudah terlihat semua (daur ulang), selesai.")
+                    return all_items
+                seen.update(item["slug"] for item in items)
+                all_items.extend(items)
+                log.info(f"  Halaman {page}: {len(items)} judul (total: {len(all_items)})")
+                last_page = max(last_page, linked_page)
+            fetched = pages[-1]
 
 
 # ══════════════════════════════════════════════════════════════════════════════
@@ -193,40 +598,174 @@ def scrape_detail(detail_url: str) -> dict | None:
       genre  → .gnr a                 |  info   → .infox .spe span
       eps    → .btn-svr               |  server → .btn-sv
     """
+    resp = _fetch_detail(detail_url)
+    if resp is None or not resp.is_success:
+        return None
+    return parse_detail(detail_url, resp.content, resp.charset_encoding)
+
+
+def _fetch_detail(detail_url: str) -> httpx.Response | None:
+    """Fetch halaman detail (retry 5x, timeout progresif); None jika gagal.
+    Status 4xx selain 429 (404, 403, 410, ...) tidak akan berubah dengan retry:
+    responsnya langsung dikembalikan, pemanggil cek resp.is_success.
+    """
     # Retry agresif: coba hingga 5x dengan timeout progresif
     resp = None
     for _attempt in range(5):
         try:
             timeout = 20 + (_attempt * 10)  # 20s, 30s, 40s, 50s, 60s
-            resp = SESSION.get(detail_url, timeout=timeout)
+            resp = _http_get(detail_url, timeout=timeout)
+            if resp.is_client_error and resp.status_code not in RETRY_STATUS:
+                log.error(f"  ✗ HTTP {resp.status_code}, tidak di-retry: {detail_url}")
+                return resp
             resp.raise_for_status()
             break
         except Exception as e:
             if _attempt < 4:
-                log.warning(f"  ⚠ Timeout/error percobaan {_attempt+1}/5: {e}. Retry dalam 3 detik...")
-                time.sleep(3)
+                delay = round(_backoff_delay(_attempt), 1)  # ±1s, 2s, 4s, 8s
+                log.warning(f"  ⚠ Timeout/error percobaan {_attempt+1}/5: {e}. Retry dalam {delay} detik...")
+                time.sleep(delay)
             else:
                 log.error(f"  ✗ Gagal fetch detail setelah 5x percobaan: {detail_url}: {e}")
                 return None
 
-    if resp is None:
-        return None
+    return resp
+
+
+# ── Parser halaman detail ──
+# Elemen ber-class berikut dikumpulkan saat streaming parse (satu pass, urut
+# dokumen), jadi parse_detail tidak perlu memindai ulang seluruh tree per class.
+DETAIL_CLASSES = frozenset({
+    "alter", "thumb", "poster", "bigcover", "banner", "backdrop", "desc", "sinopsis",
+    "anf", "gnr", "infox", "detail-content", "desc-wrap", "btn-sv",
+})
+
+# XPath sisanya di-compile sekali saat import
+XP_HEADLINE = etree.XPath('//h1[@itemprop="headline"]')
+XP_H1 = etree.XPath("//h1")
+XP_POSTER_IMG = etree.XPath("//*[contains(concat(' ', normalize-space(@class), ' '), ' poster ')]//img"
+                            " | //img[@itemprop='image']")
+XP_ALL_TEXT = etree.XPath("//text()")
+XP_META_DESC = etree.XPath("//meta[@name='description']")
+# Hanya span yang teksnya mengandung ':' (syarat perlu untuk " : " setelah
+# teks di-join), disaring di libxml2 sebelum _text() dipanggil dari Python
+XP_INFO_SPAN = etree.XPath("//span[contains(., ':')]")
+XP_IMG = etree.XPath(".//img")
+XP_LI = etree.XPath(".//li")
+XP_LINKS = etree.XPath(".//a")
+XP_GENRE_LINKS = etree.XPath(".//a[contains(@href, 'genre=')]")
+XP_HREF_LINKS = etree.XPath(".//a[@href]")
+XP_IFRAME_SRC = etree.XPath("//iframe[@src]")
+XP_DOWNLOAD = etree.XPath("//*[@id='nonot']")
+XP_NEXT_P = etree.XPath("(descendant::p | following::p)[1]")
+# Teks yang dianggap "text" oleh BeautifulSoup get_text: tanpa isi script/style/template
+XP_TEXT = etree.XPath(".//text()[not(ancestor::script or ancestor::style or ancestor::template)]")
+
+
+def _parse_detail_tree(content: bytes, encoding: str = None):
+    """Streaming parse (HTMLPullParser, per 64 KB) → (root, index class).
+    Index: {class: [(urutan, elemen)]} untuk class di DETAIL_CLASSES,
+    diisi dari event "start" selagi dokumen di-parse.
+    """
+    parser = etree.HTMLPullParser(events=("start",), encoding=encoding)
+    index = {}
+    seq = 0
+
+    def _collect():
+        nonlocal seq
+        for _, el in parser.read_events():
+            seq += 1
+            cls = el.get("class")
+            if cls:
+                for name in DETAIL_CLASSES.intersection(cls.split()):
+                    index.setdefault(name, []).append((seq, el))
+
+    for i in range(0, len(content), 65536):
+        parser.feed(content[i:i + 65536])
+        _collect()
+    try:
+        root = parser.close()
+    except etree.XMLSyntaxError:
+        root = None  # dokumen kosong
+    _collect()
+    if root is None:
+        root = etree.fromstring(b"<html></html>", etree.HTMLParser())
+    return root, index
+
 
-    soup = BeautifulSoup(resp.text, "html.parser")
+def _by_class(index: dict, *names: str) -> list:
+    """Elemen dengan salah satu class `names` (= CSS ".a, .b"), urut dokumen."""
+    if len(names) == 1:
+        return [el for _, el in index.get(names[0], ())]
+    merged = {}
+    for name in names:
+        merged.update(index.get(name, ()))
+    return [merged[k] for k in sorted(merged)]
+
+
+def _first_in(containers: list, xpath):
+    """Setara select_one(".c x"): match pertama (urut dokumen) di bawah container mana pun."""
+    for container in containers:
+        found = xpath(container)
+        if found:
+            return found[0]
+    return None
+
+
+def _text(el, sep: str = "") -> str:
+    """Setara BeautifulSoup el.get_text(sep, strip=True)."""
+    return sep.join(t for t in (s.strip() for s in XP_TEXT(el)) if t)
+
+
+def _first(xpath, node):
+    found = xpath(node)
+    return found[0] if found else None
+
+
+def _find_strings(root, *patterns) -> list:
+    """Setara soup.find(string=p) untuk tiap pattern, dalam satu pass text node.
+    Hasil per pattern: (teks, elemen induknya) atau (None, None).
+    """
+    found = [(None, None)] * len(patterns)
+    todo = len(patterns)
+    for s in XP_ALL_TEXT(root):
+        for i, pattern in enumerate(patterns):
+            if found[i][0] is None and pattern.search(s):
+                # Tail text milik elemen sebelumnya; induk sebenarnya satu level di atas
+                parent = s.getparent()
+                if s.is_tail:
+                    parent = parent.getparent()
+                found[i] = (s, parent)
+                todo -= 1
+        if not todo:
+            break
+    return found
+
+
+def parse_detail(detail_url: str, content: bytes, encoding: str = None) -> dict:
+    """Parse HTML halaman detail → dict. Fungsi murni (bytes → dict) tanpa
+    akses jaringan, sehingga bisa dijalankan di ProcessPoolExecutor.
+    Satu tree lxml + index class dari streaming parse; sisanya XPath ter-compile.
+    Nilai hasil hanya str/int/list/dict biasa (bukan smart string lxml),
+    sehingga orjson men-serialize tanpa default= maupun OPT_NON_STR_KEYS.
+    """
+    # Bytes mentah + charset dari header (None → lxml membaca <meta charset>),
+    # tanpa decode resp.text terpisah
+    root, index = _parse_detail_tree(content, encoding)
     result = {"url": detail_url}
 
     # ── Judul ──
     # Prioritas: h1[itemprop="headline"], lalu h1 kedua (yang bukan site title)
-    headline = soup.select_one('h1[itemprop="headline"]')
-    if headline:
-        result["title"] = headline.get_text(strip=True)
+    headline = _first(XP_HEADLINE, root)
+    if headline is not None:
+        result["title"] = _text(headline)
     else:
-        all_h1 = soup.select("h1")
+        all_h1 = XP_H1(root)
         # H1 pertama biasanya site title, ambil yang kedua
         if len(all_h1) >= 2:
-            result["title"] = all_h1[1].get_text(strip=True)
+            result["title"] = _text(all_h1[1])
         elif all_h1:
-            result["title"] = all_h1[0].get_text(strip=True)
+            result["title"] = _text(all_h1[0])
         else:
             result["title"] = ""
 
@@ -235,8 +774,10 @@ def scrape_detail(detail_url: str) -> dict | None:
     for prefix in ["Nonton ", "Download "]:
         if title.startswith(prefix):
             title = title[len(prefix):]
-    # Hapus "Subtitle Indonesia" di akhir
-    title = re.sub(r'\s*Subtitle Indonesia\s*$', '', title)
+    # Hapus "Subtitle Indonesia" di akhir (cek suffix biasa, tanpa regex)
+    stripped = title.rstrip()
+    if stripped.endswith(SUBS_ID_SUFFIX):
+        title = stripped[:-len(SUBS_ID_SUFFIX)].rstrip()
     
     # Fallback Slug Parser jika title kosong
     if not title:
@@ -249,52 +790,58 @@ def scrape_detail(detail_url: str) -> dict | None:
     result["title"] = title.strip()
 
     # ── Judul Alternatif / Korea ──
-    alter = soup.select_one("span.alter")
-    if alter:
-        result["alternative_title"] = alter.get_text(strip=True)
+    alter = next((el for el in _by_class(index, "alter") if el.tag == "span"), None)
+    if alter is not None:
+        result["alternative_title"] = _text(alter)
 
     # ── Poster (.thumb img) ──
-    poster_img = soup.select_one(".thumb img")
-    if poster_img:
+    poster_img = _first_in(_by_class(index, "thumb"), XP_IMG)
+    if poster_img is not None:
         result["poster"] = poster_img.get("data-src") or poster_img.get("src") or ""
     else:
         # Fallback
-        poster_img = soup.select_one(".poster img, img[itemprop='image']")
-        result["poster"] = (poster_img.get("data-src") or poster_img.get("src") or "") if poster_img else ""
+        poster_img = _first(XP_POSTER_IMG, root)
+        result["poster"] = (poster_img.get("data-src") or poster_img.get("src") or "") if poster_img is not None else ""
 
     # ── Banner / Backdrop ──
-    banner_el = soup.select_one(".bigcover img, .banner img, .backdrop img")
-    if banner_el:
+    banner_el = _first_in(_by_class(index, "bigcover", "banner", "backdrop"), XP_IMG)
+    if banner_el is not None:
         result["banner"] = banner_el.get("data-src") or banner_el.get("src") or ""
 
     # ── Sinopsis ──
     # Cari di .desc, .sinopsis, atau teks setelah header Sinopsis
-    sinopsis_div = soup.select_one(".desc, .sinopsis")
-    if sinopsis_div:
-        result["sinopsis"] = sinopsis_div.get_text(strip=True)
+    sinopsis_div = next(iter(_by_class(index, "desc", "sinopsis")), None)
+    # Header Sinopsis/Score/Rating dicari dalam satu text walk yang sama
+    header_hits = None
+    if sinopsis_div is not None:
+        result["sinopsis"] = _text(sinopsis_div)
     else:
-        synopsis_header = soup.find(string=re.compile(r"Sinopsis", re.I))
-        if synopsis_header:
-            parent = synopsis_header.find_parent()
-            if parent:
-                next_el = parent.find_next_sibling()
-                if next_el:
-                    result["sinopsis"] = next_el.get_text(strip=True)
-                else:
-                    next_p = parent.find_next("p")
-                    if next_p:
-                        result["sinopsis"] = next_p.get_text(strip=True)
+        header_hits = _find_strings(root, RE_SINOPSIS, RE_SCORE, RE_RATING)
+        _, parent = header_hits[0]
+        if parent is not None:
+            next_el = next(parent.itersiblings(tag=etree.Element), None)
+            if next_el is not None:
+                result["sinopsis"] = _text(next_el)
+            else:
+                next_p = _first(XP_NEXT_P, parent)
+                if next_p is not None:
+                    result["sinopsis"] = _text(next_p)
 
     if "sinopsis" not in result or not result.get("sinopsis"):
-        meta = soup.find("meta", attrs={"name": "description"})
-        if meta:
+        meta = _first(XP_META_DESC, root)
+        if meta is not None:
             result["sinopsis"] = meta.get("content", "")
 
     # ── Informasi detail dari <li> parent class=anf DAN <span> standalone ──
     info_fields = {}
     # Cara 1: LI di dalam .anf
-    for li in soup.select(".anf li"):
-        text = li.get_text(" ", strip=True)
+    # li di bawah .anf mana pun, urut dokumen; .anf bersarang tidak menggandakan li
+    anf_li = {}
+    for anf in _by_class(index, "anf"):
+        for li in XP_LI(anf):
+            anf_li.setdefault(li, None)
+    for li in anf_li:
+        text = _text(li, " ")
         if " : " in text:
             key, _, value = text.partition(" : ")
             key = key.strip()
@@ -304,16 +851,14 @@ def scrape_detail(detail_url: str) -> dict | None:
                 info_fields[key_clean] = value
     # Cara 2: Standalone <span> yang punya " : " (fallback)
     if not info_fields:
-        for span in soup.select("span"):
-            text = span.get_text(" ", strip=True)
+        for span in XP_INFO_SPAN(root):
+            text = _text(span, " ")
             if " : " in text and len(text) < 150:
                 key, _, value = text.partition(" : ")
-                key = key.strip()
+                key = key.strip().lower()
                 value = value.strip()
-                if key and value and key.lower() not in ("sinopsis", "informasi"):
-                    key_clean = key.lower().replace(" ", "_")
-                    if key_clean not in info_fields:
-                        info_fields[key_clean] = value
+                if key and value and key not in INFO_SKIP_KEYS:
+                    info_fields.setdefault(key.replace(" ", "_"), value)
 
     # Map ke field standar
     result["type"] = info_fields.get("type", "")
@@ -331,32 +876,47 @@ def scrape_detail(detail_url: str) -> dict | None:
             result[k] = v
 
     # ── Genre dari .gnr a (scoped, bukan sidebar) ──
-    genres = []
-    gnr_container = soup.select_one(".gnr")
-    if gnr_container:
-        for a in gnr_container.select("a"):
-            g = a.get_text(strip=True)
-            if g and g not in genres:
-                genres.append(g)
+    # dict sebagai ordered set: urutan tetap, cek keanggotaan O(1)
+    genres = {}
+    gnr_container = next(iter(_by_class(index, "gnr")), None)
+    if gnr_container is not None:
+        for a in XP_LINKS(gnr_container):
+            g = _text(a)
+            if g:
+                genres[g] = None
     else:
         # Fallback: ambil dari link genre, tapi scope ke area detail saja
-        infox = soup.select_one(".infox, .detail-content")
-        search_area = infox if infox else soup
-        for a in search_area.select("a[href*='genre=']"):
-            g = a.get_text(strip=True)
-            if g and g not in genres:
-                genres.append(g)
-    result["genres"] = genres
-
-    # ── Cast (dari .desc-wrap atau .infox, bukan sidebar) ──
-    cast = []
-    cast_area = soup.select_one(".desc-wrap") or soup.select_one(".infox") or soup
-    for a in cast_area.select("a[href*='cast=']"):
-        c = a.get_text(strip=True)
-        # Fix merged text: "Choi Jin-hyukas Kang Du-jun" → "Choi Jin-hyuk as Kang Du-jun"
-        c = re.sub(r'(\w)(as )([A-Z])', r'\1 as \3', c)
-        if c and c not in cast:
-            cast.append(c)
+        infox = next(iter(_by_class(index, "infox", "detail-content")), None)
+        search_area = infox if infox is not None else root
+        for a in XP_GENRE_LINKS(search_area):
+            g = _text(a)
+            if g:
+                genres[g] = None
+    result["genres"] = list(genres)
+
+    # ── Cast, Director, Country (dari .desc-wrap atau .infox, bukan sidebar) ──
+    # Satu kali jalan atas semua <a> di area detail, dispatch berdasarkan href
+    cast = {}
+    directors = {}
+    country = {}
+    cast_area = next(iter(_by_class(index, "desc-wrap") or _by_class(index, "infox")), root)
+    for a in XP_HREF_LINKS(cast_area):
+        href = a.get("href")
+        if "cast=" in href:
+            c = _text(a)
+            # Fix merged text: "Choi Jin-hyukas Kang Du-jun" → "Choi Jin-hyuk as Kang Du-jun"
+            if "as " in c:
+                c = RE_CAST_AS.sub(r'\1 as \3', c)
+            if c:
+                cast[c] = None
+        if "crew=" in href:
+            d = _text(a)
+            if d:
+                directors[d] = None
+        if "country=" in href:
+            c = _text(a)
+            if c:
+                country[c] = None
 
     # Jika cast masih kosong, coba parse dari Stars info field
     if not cast:
@@ -364,92 +924,77 @@ def scrape_detail(detail_url: str) -> dict | None:
         if stars_text:
             for part in stars_text.split(","):
                 part = part.strip()
-                part = re.sub(r'(\w)(as )([A-Z])', r'\1 as \3', part)
-                if part and part not in cast:
-                    cast.append(part)
+                if "as " in part:
+                    part = RE_CAST_AS.sub(r'\1 as \3', part)
+                if part:
+                    cast[part] = None
 
-    result["cast"] = cast
+    result["cast"] = list(cast)
 
     # ── Director ──
-    directors = []
-    crew_area = cast_area  # Same scoped area
-    for a in crew_area.select("a[href*='crew=']"):
-        d = a.get_text(strip=True)
-        if d and d not in directors:
-            directors.append(d)
     if not directors and info_fields.get("director"):
-        directors = [info_fields["director"]]
-    result["directors"] = directors
+        directors = {info_fields["director"]: None}
+    result["directors"] = list(directors)
 
     # ── Country ──
-    country = []
-    for a in crew_area.select("a[href*='country=']"):
-        c = a.get_text(strip=True)
-        if c and c not in country:
-            country.append(c)
     if not country and info_fields.get("country"):
-        country = [info_fields["country"]]
-    result["country"] = country
+        country = {info_fields["country"]: None}
+    result["country"] = list(country)
 
     # ── Score & Ratings ──
-    score_el = soup.find(string=re.compile(r"Score\s*:", re.I))
-    if score_el:
-        parent = score_el.find_parent()
-        if parent:
-            score_text = parent.get_text(strip=True)
-            match = re.search(r'[\d.]+', score_text)
-            if match:
-                result["score"] = match.group()
-
-    rating_el = soup.find(string=re.compile(r"\d+\s*Rating", re.I))
-    if rating_el:
-        match = re.search(r'(\d+)\s*Rating', rating_el, re.I)
+    if header_hits is not None:
+        (_, parent), (rating_el, _) = header_hits[1:]
+    else:
+        (_, parent), (rating_el, _) = _find_strings(root, RE_SCORE, RE_RATING)
+    if parent is not None:
+        match = RE_SCORE_NUM.search(_text(parent))
+        if match:
+            result["score"] = match.group()
+
+    if rating_el is not None:
+        match = RE_RATING.search(rating_el)
         if match:
             result["total_ratings"] = match.group(1)
 
     # ── Episode list ──
     # Episode buttons (.btn-svr) are loaded via JS, not in static HTML.
     # We derive episode count from metadata and generate episode list.
-    episodes = []
     ep_count_str = result.get("episode_count", "") or ""
     ep_count = 0
     try:
-        ep_count = int(re.search(r'\d+', ep_count_str).group()) if ep_count_str else 0
+        ep_count = int(RE_DIGIT.search(ep_count_str).group()) if ep_count_str else 0
     except (AttributeError, ValueError):
         pass
 
     # Juga coba parse dari title ("Episode 1 - 12" → 12)
     if not ep_count:
-        ep_match = re.search(r'Episode\s+\d+\s*-\s*(\d+)', result.get("title", ""), re.I)
+        ep_match = RE_EP_RANGE.search(result.get("title", ""))
         if ep_match:
             ep_count = int(ep_match.group(1))
 
-    for i in range(1, ep_count + 1):
-        episodes.append({"episode": str(i)})
-
-    result["episodes"] = episodes
+    # Label tetap string: sama dengan teks tombol .btn-svr di output episode_embeds
+    result["episodes"] = [{"episode": str(i)} for i in range(1, ep_count + 1)]
     result["total_episodes"] = ep_count
 
     # ── Video Servers (.btn-sv) ──
-    servers = []
-    for srv_btn in soup.select(".btn-sv"):
-        srv_name = srv_btn.get_text(strip=True)
+    servers = {}
+    for srv_btn in _by_class(index, "btn-sv"):
+        srv_name = _text(srv_btn)
         if srv_name:
-            servers.append(srv_name)
-    # Dedup
-    result["servers"] = list(dict.fromkeys(servers))
+            servers[srv_name] = None
+    result["servers"] = list(servers)
 
     # ── Video Iframe src ──
-    iframe = soup.select_one("iframe[src]")
-    if iframe:
+    iframe = _first(XP_IFRAME_SRC, root)
+    if iframe is not None:
         src = iframe.get("src", "")
         if src and not src.startswith("about:"):
             result["video_embed"] = src
 
     # ── Download button / links ──
     download_links = []
-    dl_btn = soup.select_one("#nonot, a[id='nonot']")
-    if dl_btn:
+    dl_btn = _first(XP_DOWNLOAD, root)
+    if dl_btn is not None:
         dl_url = dl_btn.get("href", "")
         if dl_url and dl_url != "#":
             download_links.append({"text": "DOWNLOAD", "url": dl_url})
@@ -462,10 +1007,14 @@ def scrape_detail(detail_url: str) -> dict | None:
 # LANGKAH 3: Scrape episode embed dengan Playwright (opsional, untuk video URL)
 # ══════════════════════════════════════════════════════════════════════════════
 
-def scrape_episodes_with_browser(detail_url: str, total_eps: int, quiet: bool = False) -> list[dict]:
+def scrape_episodes_with_browser(detail_url: str, total_eps: int, quiet: bool = False,
+                                 browser=None) -> list[dict]:
     """Gunakan Playwright untuk klik setiap episode dan ambil iframe src.
     Args:
         quiet: Jika True, tidak menampilkan log per-episode (untuk mode paralel).
+        browser: Browser Playwright yang sudah jalan (opsional). Jika diberikan,
+                 hanya dibuat context baru per judul — tanpa launch Chromium lagi.
+                 Harus dipakai dari thread yang sama dengan yang me-launch-nya.
     """
     try:
         from playwright.sync_api import sync_playwright
@@ -486,23 +1035,22 @@ def scrape_episodes_with_browser(detail_url: str, total_eps: int, quiet: bool =
 
     episodes_data = []
 
-    # Cari browser path
-    browser_path = None
-    for candidate in ["/usr/bin/chromium", "/usr/bin/chromium-browser",
-                      "/usr/bin/google-chrome", "/usr/bin/google-chrome-stable"]:
-        if os.path.isfile(candidate):
-            browser_path = candidate
-            break
-
     # Retry seluruh sesi Playwright jika terkena "Execution context destroyed"
     # (terjadi saat iklan/popup me-navigate halaman saat Playwright bekerja)
     for _pw_attempt in range(3):
         try:
-            episodes_data = _scrape_episodes_playwright(
-                detail_url, total_eps, quiet, browser_path)
+            if browser is not None:
+                episodes_data = _scrape_episodes_in_browser(
+                    browser, detail_url, total_eps, quiet)
+            else:
+                episodes_data = _scrape_episodes_playwright(
+                    detail_url, total_eps, quiet)
             break
         except Exception as e:
             err_msg = str(e).lower()
+            if browser is not None and not browser.is_connected():
+                # Browser milik pemanggil mati → biarkan pemanggil yang launch ulang
+                raise
             if "execution context" in err_msg or "target closed" in err_msg:
                 if not quiet:
                     log.warning(f"  ⚠ Browser crash (percobaan {_pw_attempt+1}/3): {e}")
@@ -517,228 +1065,387 @@ def scrape_episodes_with_browser(detail_url: str, total_eps: int, quiet: bool =
     return episodes_data
 
 
-def _scrape_episodes_playwright(detail_url: str, total_eps: int,
-                                 quiet: bool, browser_path: str | None) -> list[dict]:
-    """Internal: logika Playwright utama, dipanggil oleh scrape_episodes_with_browser."""
-    from playwright.sync_api import sync_playwright
+# Chromium/Chrome sistem; None = pakai Chromium bawaan Playwright.
+# Dicek sekali saat import, bukan per judul.
+_BROWSER_PATH = next((candidate for candidate in [
+    "/usr/bin/chromium", "/usr/bin/chromium-browser",
+    "/usr/bin/google-chrome", "/usr/bin/google-chrome-stable",
+] if os.path.isfile(candidate)), None)
 
-    episodes_data = []
 
-    with sync_playwright() as p:
-        launch_args = {"headless": True}
-        if browser_path:
-            launch_args["executable_path"] = browser_path
+# /dev/shm di container sering hanya 64 MB; banyak browser paralel memenuhinya
+# dan membuat tab crash. Dengan flag ini Chromium memakai /tmp.
+BROWSER_ARGS = ["--disable-dev-shm-usage"]
 
-        try:
-            browser = p.chromium.launch(**launch_args)
-        except Exception:
-            browser = p.chromium.launch(headless=True)
 
-        ctx = browser.new_context(
-            user_agent=HEADERS["User-Agent"],
-            viewport={"width": 1366, "height": 768}
-        )
-        page = ctx.new_page()
+def _launch_browser(p):
+    """Launch Chromium headless (pakai browser sistem jika ada)."""
+    launch_args = {"headless": True, "args": BROWSER_ARGS}
+    if _BROWSER_PATH:
+        launch_args["executable_path"] = _BROWSER_PATH
+
+    try:
+        return p.chromium.launch(**launch_args)
+    except Exception:
+        return p.chromium.launch(headless=True, args=BROWSER_ARGS)
+
 
+class EpisodeBrowser:
+    """Satu Playwright + Chromium yang dipakai ulang untuk banyak judul.
+
+    Playwright sync API terikat ke thread: buat satu EpisodeBrowser per thread.
+    Per judul hanya context baru yang dibuat (lihat _scrape_episodes_in_browser);
+    crash "execution context destroyed" di-retry dengan context baru, bukan
+    browser baru. Browser di-launch ulang jika prosesnya mati, atau setelah
+    BROWSER_RECYCLE_AFTER judul.
+
+        with EpisodeBrowser() as eb:
+            for url, eps in titles:
+                eb.scrape(url, eps)
+    """
+
+    def __init__(self):
+        self._pw = None
+        self.browser = None
+        self._uses = 0
+
+    def start(self) -> "EpisodeBrowser":
+        """Start Playwright (ImportError jika belum terinstall)."""
+        from playwright.sync_api import sync_playwright
+        self._pw = sync_playwright().start()
+        return self
+
+    def close(self):
         try:
-            page.goto(detail_url, wait_until="domcontentloaded", timeout=25000)
-        except Exception:
-            pass
+            if self.browser is not None and self.browser.is_connected():
+                self.browser.close()
+        finally:
+            if self._pw is not None:
+                self._pw.stop()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def ensure_browser(self):
+        """Browser yang hidup; launch (ulang) jika belum ada, prosesnya mati,
+        atau sudah dipakai BROWSER_RECYCLE_AFTER kali."""
+        if self.browser is not None and self._uses >= BROWSER_RECYCLE_AFTER:
+            browser, self.browser = self.browser, None
+            if browser.is_connected():
+                browser.close()
+        if self.browser is None or not self.browser.is_connected():
+            self.browser = _launch_browser(self._pw)
+            self._uses = 0
+        self._uses += 1
+        return self.browser
+
+    def scrape(self, detail_url: str, total_eps: int, quiet: bool = False) -> list[dict]:
+        return scrape_episodes_with_browser(detail_url, total_eps, quiet=quiet,
+                                            browser=self.ensure_browser())
+
+
+def _scrape_episodes_playwright(detail_url: str, total_eps: int, quiet: bool) -> list[dict]:
+    """Internal: launch browser sekali pakai lalu jalankan _scrape_episodes_in_browser."""
+    with EpisodeBrowser() as eb:
+        return _scrape_episodes_in_browser(eb.ensure_browser(), detail_url, total_eps, quiet)
+
 
-        # Smart-wait Fase 1: Tunggu .btn-svr (tombol episode) muncul dulu (max 20 detik)
-        # Iframe sering muncul LEBIH CEPAT dari tombol episode, jadi kita HARUS
-        # prioritaskan menunggu tombol episode agar tidak salah deteksi sebagai "Film Single".
+def _scrape_episodes_in_browser(browser, detail_url: str, total_eps: int,
+                                quiet: bool) -> list[dict]:
+    """Internal: logika Playwright utama dalam context baru milik browser yang diberikan.
+    Context (cookies, cache, tab) selalu ditutup di akhir; browser dibiarkan hidup.
+    """
+    ctx = browser.new_context(
+        user_agent=HEADERS["User-Agent"],
+        viewport={"width": 1366, "height": 768}
+    )
+    ctx.route("**/*", _block_heavy_requests)
+    ctx.add_init_script(JS_NO_AUTOPLAY)
+    try:
+        return _scrape_episodes_page(ctx.new_page(), detail_url, total_eps, quiet)
+    finally:
+        ctx.close()
+
+
+def _is_ad(url: str) -> bool:
+    return bool(url) and AD_RE.search(url) is not None
+
+
+def episodes_from_static(detail: dict) -> list[dict] | None:
+    """Episode embed tanpa browser, jika HTML statis sudah cukup.
+
+    Hanya untuk film (type Movie) yang iframe player-nya sudah ada di halaman
+    statis (detail["video_embed"]). Tombol episode series (.btn-svr) dirender
+    oleh script player eksternal, jadi series tetap lewat Playwright.
+    None = perlu Playwright.
+    """
+    src = detail.get("video_embed", "")
+    if not src or _is_ad(src) or "movie" not in detail.get("type", "").lower():
+        return None
+    return [{"episode": "1", "video_embed": src, "servers_available": detail.get("servers", [])}]
+
+
+def _block_heavy_requests(route):
+    """Route handler: batalkan gambar/font/CSS/media dan request ke domain iklan.
+    Iframe player (resource_type "document") tetap dimuat."""
+    request = route.request
+    if (request.resource_type in BLOCKED_RESOURCE_TYPES
+            or _is_ad(request.url)):
+        return route.abort()
+    return route.continue_()
+
+
+def _scrape_episodes_page(page, detail_url: str, total_eps: int, quiet: bool) -> list[dict]:
+    """Internal: klik setiap episode di `page` dan kumpulkan iframe src."""
+    episodes_data = []
+
+    try:
+        # "commit": DOM tidak ditunggu; .btn-svr / iframe ditunggu di bawah
+        page.goto(detail_url, wait_until="commit", timeout=25000)
+    except Exception:
+        pass
+
+    # Smart-wait Fase 1: Tunggu .btn-svr (tombol episode) muncul dulu (max 20 detik)
+    # Iframe sering muncul LEBIH CEPAT dari tombol episode, jadi kita HARUS
+    # prioritaskan menunggu tombol episode agar tidak salah deteksi sebagai "Film Single".
+    # wait_for_selector selesai begitu elemen ada, tanpa polling per detik.
+    try:
+        page.wait_for_selector(".btn-svr", state="attached", timeout=20000)
+        buttons_found = True
+    except Exception:
         buttons_found = False
-        for _attempt in range(20):
-            btn_count = page.evaluate("""() => document.querySelectorAll('.btn-svr').length""")
-            if btn_count > 0:
-                buttons_found = True
-                break
-            page.wait_for_timeout(1000)
-
-        # Smart-wait Fase 2: Jika tombol tidak ditemukan, tunggu iframe saja (max 5 detik lagi)
-        if not buttons_found:
-            for _attempt in range(5):
-                has_iframe = page.evaluate("""() => {
-                    const iframe = document.querySelector('iframe');
-                    return iframe && iframe.src && !iframe.src.startsWith('about:');
-                }""")
-                if has_iframe:
-                    break
-                page.wait_for_timeout(1000)
 
-        # Ambil daftar episode dengan JavaScript (cari .btn-svr buttons)
-        ep_info = page.evaluate("""() => {
-            const btns = document.querySelectorAll('.btn-svr');
-            return Array.from(btns).map((b, i) => ({
-                index: i,
-                text: b.textContent.trim(),
-                mid: b.getAttribute('data-mid') || '',
-                tag: b.getAttribute('data-tag') || ''
-            }));
-        }""")
+    # Smart-wait Fase 2: Jika tombol tidak ditemukan, tunggu iframe saja (max 5 detik lagi)
+    if not buttons_found:
+        try:
+            page.wait_for_function("""() => {
+                const iframe = document.querySelector('iframe');
+                return iframe && iframe.src && !iframe.src.startsWith('about:');
+            }""", timeout=5000)
+        except Exception:
+            pass
 
-        if not ep_info:
-            # Fallback: cari tombol angka 1-N (tanpa strict check thd totalEps barangkali metadata salah)
-            ep_info = page.evaluate("""(totalEps) => {
-                const results = [];
-                const buttons = document.querySelectorAll('button, a.btn');
-                for (const btn of buttons) {
-                    const txt = btn.textContent.trim();
-                    if (/^\\d+$/.test(txt)) {
-                        const num = parseInt(txt);
-                        if (num >= 1) {
-                            results.push({index: results.length, text: txt});
-                        }
+    # Ambil daftar episode dengan JavaScript (cari .btn-svr buttons)
+    ep_info = page.evaluate("""() => {
+        const btns = document.querySelectorAll('.btn-svr');
+        return Array.from(btns).map((b, i) => ({
+            index: i,
+            text: b.textContent.trim(),
+            mid: b.getAttribute('data-mid') || '',
+            tag: b.getAttribute('data-tag') || ''
+        }));
+    }""")
+
+    if not ep_info:
+        # Fallback: cari tombol angka 1-N (tanpa strict check thd totalEps barangkali metadata salah)
+        ep_info = page.evaluate("""(totalEps) => {
+            const results = [];
+            const buttons = document.querySelectorAll('button, a.btn');
+            for (const btn of buttons) {
+                const txt = btn.textContent.trim();
+                if (/^\\d+$/.test(txt)) {
+                    const num = parseInt(txt);
+                    if (num >= 1) {
+                        results.push({index: results.length, text: txt});
                     }
                 }
-                return results;
-            }""", total_eps)
-
-        # ── Definisi domain iklan ──
-        ad_domains = ['dtscout.com', 'doubleclick', 'googlesyndication', 'adnxs.com']
+            }
+            return results;
+        }""", total_eps)
+
+    def _get_iframe_src(pg=page):
+        return pg.evaluate("""() => {
+            const iframe = document.querySelector('iframe');
+            return (iframe && iframe.src && !iframe.src.startsWith('about:')) ? iframe.src : '';
+        }""")
 
-        def _is_ad(url):
-            return any(ad in url.lower() for ad in ad_domains) if url else False
+    def _click_episode(pg, idx):
+        return pg.evaluate("""(idx) => {
+            const btns = document.querySelectorAll('.btn-svr');
+            if (btns[idx]) {
+                btns[idx].click();
+                return true;
+            }
+            return false;
+        }""", idx)
+
+    def _wait_for_clean_iframe(max_wait=5, pg=page):
+        """Tunggu iframe valid (bukan iklan) hingga max_wait detik."""
+        try:
+            pg.wait_for_function("""(ads) => {
+                const iframe = document.querySelector('iframe');
+                const src = (iframe && iframe.src && !iframe.src.startsWith('about:')) ? iframe.src : '';
+                return src && !ads.some(ad => src.toLowerCase().includes(ad));
+            }""", arg=AD_DOMAINS, timeout=max_wait * 1000)
+        except Exception:
+            return ""
+        return _get_iframe_src(pg)
 
-        def _get_iframe_src():
-            return page.evaluate("""() => {
+    def _wait_for_iframe_change(pg, prev_src, timeout=5000):
+        """Tunggu iframe src berganti dari `prev_src` setelah klik episode.
+        Selesai begitu player baru terpasang; kalau timeout, src dibaca apa adanya.
+        """
+        try:
+            pg.wait_for_function("""(prev) => {
                 const iframe = document.querySelector('iframe');
-                return (iframe && iframe.src && !iframe.src.startsWith('about:')) ? iframe.src : '';
-            }""")
+                return iframe && iframe.src && !iframe.src.startsWith('about:') && iframe.src !== prev;
+            }""", arg=prev_src, timeout=timeout)
+        except Exception:
+            pass
 
-        def _wait_for_clean_iframe(max_wait=5):
-            """Tunggu iframe valid (bukan iklan) hingga max_wait detik."""
-            for _ in range(max_wait):
-                src = _get_iframe_src()
-                if src and not _is_ad(src):
-                    return src
-                page.wait_for_timeout(1000)
-            return ""
+    def _wait_for_buttons(pg):
+        """Tunggu tombol episode muncul (max 20 detik)."""
+        try:
+            pg.wait_for_selector(".btn-svr", state="attached", timeout=20000)
+        except Exception:
+            pass
 
-        def _reload_and_wait():
-            """Reload halaman dan tunggu tombol episode muncul lagi."""
-            log.info(f"  🔄 Reload halaman untuk menghindari iklan...")
-            try:
-                page.goto(detail_url, wait_until="domcontentloaded", timeout=25000)
-            except Exception:
-                pass
-            # Tunggu tombol episode muncul
-            for _ in range(20):
-                cnt = page.evaluate("""() => document.querySelectorAll('.btn-svr').length""")
-                if cnt > 0:
-                    break
-                page.wait_for_timeout(1000)
+    def _reload_and_wait(pg=page):
+        """Reload halaman dan tunggu tombol episode muncul lagi."""
+        log.info(f"  🔄 Reload halaman untuk menghindari iklan...")
+        try:
+            pg.goto(detail_url, wait_until="commit", timeout=25000)
+        except Exception:
+            pass
+        _wait_for_buttons(pg)
 
-        # ── Ambil iframe awal, reload jika terkena iklan (max 3x) ──
-        initial_src = ""
-        for _reload_attempt in range(3):
-            initial_src = _wait_for_clean_iframe(5)
-            if initial_src and not _is_ad(initial_src):
-                break
-            # Iframe kosong atau iklan → reload
-            if _reload_attempt < 2:
-                _reload_and_wait()
-                # Re-collect ep_info setelah reload
-                ep_info = page.evaluate("""() => {
-                    const btns = document.querySelectorAll('.btn-svr');
-                    return Array.from(btns).map((b, i) => ({
-                        index: i,
-                        text: b.textContent.trim(),
-                        mid: b.getAttribute('data-mid') || '',
-                        tag: b.getAttribute('data-tag') || ''
-                    }));
-                }""")
-
-        if not ep_info:
-            if initial_src and not _is_ad(initial_src):
-                if not quiet:
-                    log.info(f"  Film Single / Movie terdeteksi. Menyimpan iframe utama...")
-                episodes_data.append({
-                    "episode": "1",
-                    "video_embed": initial_src,
-                })
-                browser.close()
-                return episodes_data
-            else:
-                if not quiet:
-                    log.warning(f"  Tidak ada tombol episode & tidak ada iframe video ditemukan.")
-                browser.close()
-                return []
+    # ── Ambil iframe awal, reload jika terkena iklan (max 3x) ──
+    initial_src = ""
+    for _reload_attempt in range(3):
+        initial_src = _wait_for_clean_iframe(5)
+        if initial_src and not _is_ad(initial_src):
+            break
+        # Iframe kosong atau iklan → reload
+        if _reload_attempt < 2:
+            _reload_and_wait()
+            # Re-collect ep_info setelah reload
+            ep_info = page.evaluate("""() => {
+                const btns = document.querySelectorAll('.btn-svr');
+                return Array.from(btns).map((b, i) => ({
+                    index: i,
+                    text: b.textContent.trim(),
+                    mid: b.getAttribute('data-mid') || '',
+                    tag: b.getAttribute('data-tag') || ''
+                }));
+            }""")
 
-        # Simpan Ep 1 dari initial page (hanya jika bukan iklan)
+    if not ep_info:
         if initial_src and not _is_ad(initial_src):
+            if not quiet:
+                log.info(f"  Film Single / Movie terdeteksi. Menyimpan iframe utama...")
             episodes_data.append({
-                "episode": ep_info[0]["text"] if ep_info else "1",
+                "episode": "1",
                 "video_embed": initial_src,
             })
+            return episodes_data
+        else:
             if not quiet:
-                log.info(f"  Ep {ep_info[0]['text'] if ep_info else '1'}: {initial_src[:60]}...")
-
-        # ── Klik setiap episode tombol ──
-        consecutive_fails = 0
-        for i, ep in enumerate(ep_info):
-            # Skip episode pertama kalau sudah diambil
-            if i == 0 and initial_src and not _is_ad(initial_src):
-                continue
+                log.warning(f"  Tidak ada tombol episode & tidak ada iframe video ditemukan.")
+            return []
 
+    # Simpan Ep 1 dari initial page (hanya jika bukan iklan)
+    if initial_src and not _is_ad(initial_src):
+        episodes_data.append({
+            "episode": ep_info[0]["text"] if ep_info else "1",
+            "video_embed": initial_src,
+        })
+        if not quiet:
+            log.info(f"  Ep {ep_info[0]['text'] if ep_info else '1'}: {initial_src[:60]}...")
+
+    # ── Klik setiap episode tombol ──
+    # Episode dibagi ke beberapa tab dalam context yang sama (EPISODE_TABS).
+    # Per batch, semua tab diklik dulu lalu ditunggu bersama: waktu tunggu
+    # iframe tiap episode saling overlap, bukan dijumlahkan.
+    pending = [(i, ep) for i, ep in enumerate(ep_info)
+               # Skip episode pertama kalau sudah diambil
+               if not (i == 0 and initial_src and not _is_ad(initial_src))]
+
+    tabs = [page]
+    for _ in range(min(EPISODE_TABS, len(pending)) - 1):
+        tab = page.context.new_page()
+        try:
+            tab.goto(detail_url, wait_until="commit", timeout=25000)
+        except Exception:
+            pass
+        tabs.append(tab)
+    for tab in tabs[1:]:
+        _wait_for_buttons(tab)
+
+    consecutive_fails = [0] * len(tabs)
+    for start in range(0, len(pending), len(tabs)):
+        batch = list(enumerate(pending[start:start + len(tabs)]))
+        srcs = {}
+        errors = {}
+
+        # Klik episode button di masing-masing tab (catat src lama untuk deteksi pergantian)
+        prev_src = {}
+        for t, (i, ep) in batch:
             try:
-                # Klik episode button
-                clicked = page.evaluate(f"""(idx) => {{
-                    const btns = document.querySelectorAll('.btn-svr');
-                    if (btns[idx]) {{
-                        btns[idx].click();
-                        return true;
-                    }}
-                    return false;
-                }}""", i)
-
-                if not clicked:
+                prev_src[i] = _get_iframe_src(tabs[t])
+                if not _click_episode(tabs[t], i):
                     if not quiet:
                         log.warning(f"  Ep {ep['text']}: tombol tidak ditemukan")
-                    continue
-
-                # Tunggu + retry jika iklan atau kosong (max 3x)
-                src = ""
-                for _retry in range(3):
-                    page.wait_for_timeout(2500)
-                    src = _get_iframe_src()
+                    errors[i] = None
+            except Exception as e:
+                errors[i] = e
 
+        # Tunggu + retry jika iklan atau kosong (max 3x). Tunggu per tab selesai
+        # begitu iframe berganti; tab berikutnya biasanya sudah siap saat giliran.
+        for _retry in range(3):
+            waiting = [(t, i, ep) for t, (i, ep) in batch if i not in srcs and i not in errors]
+            if not waiting:
+                break
+            for t, i, ep in waiting:
+                try:
+                    _wait_for_iframe_change(tabs[t], prev_src[i])
+                    src = _get_iframe_src(tabs[t])
                     if src and not _is_ad(src):
-                        break  # URL valid!
+                        srcs[i] = src  # URL valid!
+                        continue
 
                     if _is_ad(src):
                         if not quiet:
                             log.warning(f"  Ep {ep['text']}: iklan terdeteksi, retry...")
 
                     # Re-click tombol episode
-                    page.evaluate(f"""(idx) => {{
-                        const btns = document.querySelectorAll('.btn-svr');
-                        if (btns[idx]) btns[idx].click();
-                    }}""", i)
+                    prev_src[i] = src
+                    _click_episode(tabs[t], i)
+                except Exception as e:
+                    errors[i] = e
 
-                clean_src = src if (src and not _is_ad(src)) else ""
+        for t, (i, ep) in batch:
+            if i in errors:
+                e = errors[i]
+                if e is not None:
+                    if not quiet:
+                        log.warning(f"  Ep {ep['text']} error: {e}")
+                    episodes_data.append({"episode": ep["text"], "video_embed": "", "error": str(e)})
+                continue
+
+            try:
+                clean_src = srcs.get(i, "")
 
                 if clean_src:
-                    consecutive_fails = 0
+                    consecutive_fails[t] = 0
                 else:
-                    consecutive_fails += 1
+                    consecutive_fails[t] += 1
 
-                # Jika 3 episode berturut-turut gagal → halaman terkena hijack iklan
-                # Reload halaman dan coba ulang dari episode ini
-                if consecutive_fails >= 3:
+                # Jika 3 episode berturut-turut gagal di tab ini → terkena hijack iklan
+                # Reload tab dan coba ulang dari episode ini
+                if consecutive_fails[t] >= 3:
                     if not quiet:
                         log.warning(f"  ⚠ 3 episode berturut-turut gagal. Reload halaman...")
-                    _reload_and_wait()
-                    consecutive_fails = 0
+                    _reload_and_wait(tabs[t])
+                    consecutive_fails[t] = 0
 
                     # Re-click episode ini setelah reload
-                    page.evaluate(f"""(idx) => {{
-                        const btns = document.querySelectorAll('.btn-svr');
-                        if (btns[idx]) btns[idx].click();
-                    }}""", i)
-                    page.wait_for_timeout(3000)
-                    clean_src = _wait_for_clean_iframe(5)
+                    reload_src = _get_iframe_src(tabs[t])
+                    _click_episode(tabs[t], i)
+                    _wait_for_iframe_change(tabs[t], reload_src, timeout=3000)
+                    clean_src = _wait_for_clean_iframe(5, tabs[t])
 
                 episodes_data.append({
                     "episode": ep["text"],
@@ -752,16 +1459,17 @@ def _scrape_episodes_playwright(detail_url: str, total_eps: int,
                     log.warning(f"  Ep {ep['text']} error: {e}")
                 episodes_data.append({"episode": ep["text"], "video_embed": "", "error": str(e)})
 
-        # Ambil semua server names
-        servers = page.evaluate("""() => {
-            return Array.from(document.querySelectorAll('.btn-sv')).map(b => b.textContent.trim()).filter(t => t);
-        }""")
+    for tab in tabs[1:]:
+        tab.close()
 
-        # Tambahkan server info ke setiap episode
-        for ep_data in episodes_data:
-            ep_data["servers_available"] = servers
+    # Ambil semua server names
+    servers = page.evaluate("""() => {
+        return Array.from(document.querySelectorAll('.btn-sv')).map(b => b.textContent.trim()).filter(t => t);
+    }""")
 
-        browser.close()
+    # Tambahkan server info ke setiap episode
+    for ep_data in episodes_data:
+        ep_data["servers_available"] = servers
 
     return episodes_data
 
@@ -770,8 +1478,213 @@ def _scrape_episodes_playwright(detail_url: str, total_eps: int,
 # LANGKAH 4: Pipeline utama
 # ══════════════════════════════════════════════════════════════════════════════
 
+# Verifikasi: klik semua episode kosong dalam satu page.evaluate. Per episode:
+# klik tombol, tunggu (MutationObserver) iframe di-set ulang ke src bukan iklan,
+# klik ulang maks 3x dengan batas 8 detik per klik. Iframe yang tidak disentuh
+# sampai timeout dianggap gagal (src lama milik episode lain). Hasil: [{i, src}].
+JS_RETRY_EPISODES = """async ([idxs, ads]) => {
+    const current = () => {
+        const f = document.querySelector('iframe');
+        return (f && f.src && !f.src.startsWith('about:')) ? f.src : '';
+    };
+    const clean = (src) => src && !ads.some(ad => src.toLowerCase().includes(ad));
+    const touchesIframe = (records) => records.some(r => r.type === 'attributes'
+        ? r.target.nodeName === 'IFRAME'
+        : [...r.addedNodes].some(n => n.nodeName === 'IFRAME'
+                                      || (n.querySelector && n.querySelector('iframe'))));
+    const waitIframe = (prev, ms) => new Promise(resolve => {
+        let obs, timer;
+        const check = (touched) => {
+            const src = current();
+            if ((touched || src !== prev) && clean(src)) {
+                obs.disconnect(); clearTimeout(timer); resolve(src);
+            }
+        };
+        obs = new MutationObserver(records => check(touchesIframe(records)));
+        obs.observe(document.body, {subtree: true, childList: true,
+                                    attributes: true, attributeFilter: ['src']});
+        timer = setTimeout(() => { obs.disconnect(); resolve(''); }, ms);
+        check(false);
+    });
+    const out = [];
+    for (const i of idxs) {
+        const prev = current();
+        let src = '';
+        for (let attempt = 0; attempt < 3 && !clean(src); attempt++) {
+            const btn = document.querySelectorAll('.btn-svr')[i];
+            if (btn) btn.click();
+            src = await waitIframe(prev, 8000);
+        }
+        out.push({i, src});
+    }
+    return out;
+}"""
+
+
+def _read_jsonl(jsonl_path: str):
+    """Generator record dari file JSONL (baris kosong dilewati)."""
+    with open(jsonl_path, "rb") as src:
+        for line in src:
+            if line.strip():
+                yield orjson.loads(line)
+
+
+def _write_full_json(full_path: str, metadata: dict, records):
+    """Tulis file JSON gabungan {"metadata", "dramas"} record per record.
+    Tiap record di-serialize sendiri, jadi tidak pernah ada satu buffer bytes
+    seukuran seluruh data; hasilnya identik dengan orjson.dumps(...,
+    OPT_INDENT_2) atas seluruh data. `records` boleh generator (_read_jsonl).
+    Ditulis ke .tmp lalu os.replace: file yang terpotong (crash/Ctrl+C) tidak
+    pernah muncul sebagai drakorkita_full_*.json yang dibaca --resume.
+    """
+    tmp_path = full_path + ".tmp"
+    with open(tmp_path, "wb") as out:
+        # '{\n  "metadata": {...}\n}' → buang '\n}' penutup, lanjutkan dengan "dramas"
+        out.write(orjson.dumps({"metadata": metadata}, option=orjson.OPT_INDENT_2)[:-2])
+        out.write(b',\n  "dramas": [')
+        first = True
+        for rec in records:
+            record = orjson.dumps(rec, option=orjson.OPT_INDENT_2)
+            out.write(b"\n    " if first else b",\n    ")
+            out.write(record.replace(b"\n", b"\n    "))
+            first = False
+        out.write(b"]\n}" if first else b"\n  ]\n}")
+    os.replace(tmp_path, full_path)
+
+
+def _write_checkpoint(path: str, details: list[dict]):
+    """Tulis snapshot details secara atomik (tmp lalu os.replace)."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(orjson.dumps(details))
+    os.replace(tmp_path, path)
+
+
+def _append_line(f, line: bytes):
+    f.write(line)
+    f.flush()
+
+
+def _read_jsonl_crashed(jsonl_path: str) -> list:
+    """Record JSONL dari run yang crash: baris terakhir yang terpotong dibuang."""
+    records = []
+    try:
+        for rec in _read_jsonl(jsonl_path):
+            records.append(rec)
+    except orjson.JSONDecodeError:
+        pass
+    return records
+
+
+def _previous_run_dramas() -> tuple[str, list] | None:
+    """(nama file, list detail) dari run terakhir di OUTPUT_DIR.
+
+    Run yang selesai: "dramas" di file full. Run yang crash: checkpoint
+    terakhir (atau detail LANGKAH 2 di .jsonl jika belum ada checkpoint),
+    lalu episode_embeds dari .episodes.jsonl (per url) yang selesai setelahnya.
+    """
+    runs = {}
+    for path in glob.glob(os.path.join(OUTPUT_DIR, "drakorkita_full_*")):
+        m = RE_RUN_FILE.fullmatch(os.path.basename(path))
+        if m:
+            runs.setdefault(m[1], {})[m[2]] = path
+    if not runs:
+        return None
+    files = max(runs.values(), key=lambda f: max(map(os.path.getmtime, f.values())))
+
+    if "json" in files:
+        source = files["json"]
+        with open(source, "rb") as f:
+            data = orjson.loads(f.read())
+        return source, data.get("dramas") if isinstance(data, dict) else None
+
+    if "checkpoint.json" in files:
+        source = files["checkpoint.json"]
+        with open(source, "rb") as f:
+            dramas = orjson.loads(f.read())
+    elif "jsonl" in files:
+        source = files["jsonl"]
+        dramas = _read_jsonl_crashed(source)
+    else:
+        return files["episodes.jsonl"], []
+    if isinstance(dramas, list) and "episodes.jsonl" in files:
+        episodes = {r["url"]: r["episode_embeds"]
+                    for r in _read_jsonl_crashed(files["episodes.jsonl"])
+                    if isinstance(r, dict) and "url" in r}
+        for d in dramas:
+            if isinstance(d, dict) and d.get("url") in episodes:
+                d["episode_embeds"] = episodes[d["url"]]
+    return source, dramas
+
+
+def _load_previous_details(require_episodes: bool) -> dict[str, dict]:
+    """Detail dari run terakhir di OUTPUT_DIR → {url: detail}: file
+    drakorkita_full_*.json terbaru, atau sisa run yang crash jika lebih baru
+    (lihat _previous_run_dramas).
+    Dengan require_episodes, hanya judul yang semua episodenya sudah punya
+    video_embed; judul dengan episode kosong tetap di-scrape ulang.
+    """
+    try:
+        found = _previous_run_dramas()
+    except (OSError, orjson.JSONDecodeError) as e:
+        log.warning(f"  ⚠ Gagal baca run sebelumnya: {e}")
+        return {}
+    if found is None:
+        return {}
+    latest, dramas = found
+    if not isinstance(dramas, list):
+        log.warning(f"  ⚠ {os.path.basename(latest)} bukan file full/checkpoint drakorkita, diabaikan")
+        return {}
+
+    previous = {}
+    for d in dramas:
+        if not isinstance(d, dict):
+            continue
+        eps = d.get("episode_embeds")
+        if require_episodes and not (eps and all(ep.get("video_embed") for ep in eps)):
+            continue
+        if d.get("url"):
+            previous[d["url"]] = d
+    log.info(f"  ↺ Resume dari {os.path.basename(latest)}: {len(previous)} judul dilewati")
+    return previous
+
+
+def _open_manifest() -> sqlite3.Connection:
+    """Buka (atau buat) manifest sqlite: scraped(slug, ts, detail_json)."""
+    conn = sqlite3.connect(MANIFEST_PATH, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("CREATE TABLE IF NOT EXISTS scraped "
+                 "(slug TEXT PRIMARY KEY, ts INTEGER, detail_json TEXT)")
+    return conn
+
+
+@contextlib.contextmanager
+def _queued_logging():
+    """Selama run penuh, record log dititipkan ke queue dan ditulis thread
+    QueueListener: worker tidak ikut menunggu I/O stderr (atau lock handler)
+    di tiap baris progress. Handler root diambil saat run dimulai (termasuk
+    yang dipasang pemanggil setelah import), lalu logger dikembalikan seperti semula.
+    """
+    log_queue = queue.Queue()
+    handler = logging.handlers.QueueHandler(log_queue)
+    listener = logging.handlers.QueueListener(log_queue, *logging.getLogger().handlers,
+                                              respect_handler_level=True)
+    propagate = log.propagate
+    log.addHandler(handler)
+    log.propagate = False
+    listener.start()
+    try:
+        yield
+    finally:
+        listener.stop()
+        log.removeHandler(handler)
+        log.propagate = propagate
+
+
 def run_full_scrape(max_pages: int = None, scrape_episodes: bool = False,
-                    max_details: int = None, filter_params: dict = None):
+                    max_details: int = None, filter_params: dict = None,
+                    force_refresh: bool = False, resume: bool = False):
     """
     Pipeline lengkap: Listing → Detail → (Opsional: Episode embeds).
     
@@ -780,7 +1693,19 @@ def run_full_scrape(max_pages: int = None, scrape_episodes: bool = False,
         scrape_episodes: Jika True, gunakan Playwright untuk ambil video embed per episode
         max_details: Batasi jumlah detail halaman yang di-scrape (None = semua)
         filter_params: Parameter filter untuk listing (misal: {"media_type": "tv"})
+        force_refresh: Jika True, abaikan manifest dan scrape ulang semua detail
+        resume: Jika True, judul yang sudah lengkap di file full terakhir
+                (atau checkpoint run yang crash) dipakai ulang (detail +
+                episode) tanpa scrape ulang
     """
+    with _queued_logging():
+        return _run_full_scrape(max_pages, scrape_episodes, max_details,
+                                filter_params, force_refresh, resume)
+
+
+def _run_full_scrape(max_pages, scrape_episodes, max_details, filter_params,
+                     force_refresh, resume):
+    """Isi run_full_scrape; log drakorkita sudah lewat queue (_queued_logging)."""
     timestamp = int(time.time())
 
     print(f"\n{'═'*60}")
@@ -793,6 +1718,15 @@ def run_full_scrape(max_pages: int = None, scrape_episodes: bool = False,
     # Step 1: Crawl listing
     log.info("LANGKAH 1: Crawl daftar drama/film...")
     all_items = crawl_all_listings(max_pages=max_pages, params=filter_params)
+    # Judul bisa muncul di dua halaman listing (urutan bergeser saat ada judul
+    # baru) → dedup per detail_url sebelum LANGKAH 2, kemunculan pertama menang.
+    # Duplikat yang tetap lolos bersamaan di-coalesce oleh _http_get.
+    unique_items = {}
+    for item in all_items:
+        unique_items.setdefault(item["detail_url"], item)
+    if len(unique_items) < len(all_items):
+        log.info(f"  ↺ {len(all_items) - len(unique_items)} judul duplikat antar halaman dibuang")
+    all_items = list(unique_items.values())
     log.info(f"✓ Total {len(all_items)} judul ditemukan\n")
 
     if not all_items:
@@ -801,8 +1735,8 @@ def run_full_scrape(max_pages: int = None, scrape_episodes: bool = False,
 
     # Simpan daftar listing
     listing_path = os.path.join(OUTPUT_DIR, f"drakorkita_listing_{timestamp}.json")
-    with open(listing_path, "w", encoding="utf-8") as f:
-        json.dump({
+    with open(listing_path, "wb") as f:
+        f.write(orjson.dumps({
             "metadata": {
                 "source": BASE_URL,
                 "scrape_date": datetime.now().isoformat(),
@@ -810,57 +1744,113 @@ def run_full_scrape(max_pages: int = None, scrape_episodes: bool = False,
                 "pages_crawled": max_pages or "all",
             },
             "titles": all_items
-        }, f, ensure_ascii=False, indent=2)
+        }, option=orjson.OPT_INDENT_2))
     log.info(f"📁 Daftar listing disimpan: {listing_path}\n")
 
     # Step 2: Scrape detail untuk setiap judul (PARALEL — sangat cepat)
     log.info("LANGKAH 2: Scrape detail per judul (PARALEL)...")
+    full_path = os.path.join(OUTPUT_DIR, f"drakorkita_full_{timestamp}.json")
+    jsonl_path = full_path[:-len(".json")] + ".jsonl"
+    checkpoint_path = full_path[:-len(".json")] + ".checkpoint.json"
+    episodes_jsonl_path = full_path[:-len(".json")] + ".episodes.jsonl"
+
+    # Thread worker hanya fetch (I/O); parse HTML (CPU) dijalankan di proses
+    # terpisah supaya tidak antre di GIL. Proses ini sudah multi-thread
+    # (QueueListener log, pool HTTP listing), jadi worker parser tidak di-fork
+    # dari sini: forkserver (spawn jika tidak tersedia) memulai proses bersih.
+    start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    parse_pool = ProcessPoolExecutor(max_workers=min(os.cpu_count() or 1, 10),
+                                     mp_context=multiprocessing.get_context(start_method))
+
+    # Semua tulis ke disk lewat satu thread I/O (urutan submit = urutan tulis),
+    # jadi worker scraping tidak pernah menunggu disk.
+    io_pool = ThreadPoolExecutor(max_workers=1)
+
+    # Dibaca sebelum JSONL run ini dibuat: file itu sendiri tidak boleh
+    # terpilih sebagai "run terakhir"
+    previous = _load_previous_details(scrape_episodes) if resume else {}
+
+    # Setiap detail langsung ditulis 1 baris ke JSONL (progress aman jika crash).
+    # Tanpa scrape episode, detail tidak perlu ditahan di memori: file gabungan
+    # dirakit ulang dari JSONL di akhir.
+    jsonl_file = open(jsonl_path, "wb")
     details = []
+    scraped = itertools.count()
     total = min(len(all_items), max_details) if max_details else len(all_items)
 
-    from concurrent.futures import ThreadPoolExecutor, as_completed
-    import threading
-
     lock_detail = threading.Lock()
-    completed_detail = [0]
+    # next() pada itertools.count atomik di CPython: counter tanpa lock
+    completed_detail = itertools.count(1)
+    # Koneksi sqlite dipakai bersama semua worker, selalu di bawah lock_detail
+    manifest = _open_manifest()
+    # Slug yang masih segar dimuat sekali di awal; slug lain langsung di-scrape
+    # tanpa menyentuh sqlite
+    if force_refresh:
+        known = set()
+    else:
+        known = {slug for (slug,) in manifest.execute(
+            "SELECT slug FROM scraped WHERE ts >= ?", (int(time.time() - MANIFEST_TTL),))}
+    if known:
+        log.info(f"  ↺ {len(known)} judul masih segar di manifest, tidak di-fetch ulang")
 
     def _scrape_detail_worker(args):
         i, item = args
         try:
-            # Retry agresif: jika scrape_detail gagal, coba ulang hingga 3x
-            detail = None
-            for _retry in range(3):
-                detail = scrape_detail(item["detail_url"])
-                if detail:
-                    break
-                if _retry < 2:
-                    time.sleep(3)
+            # --resume: detail (+ episode) dari run terakhir (full/checkpoint); lalu manifest
+            detail = previous.get(item["detail_url"])
+            if detail is None and item["slug"] in known:
+                with lock_detail:
+                    row = manifest.execute("SELECT detail_json FROM scraped WHERE slug=?",
+                                           (item["slug"],)).fetchone()
+                if row is not None:
+                    detail = orjson.loads(row[0])
+            from_manifest = detail is not None
+
+            if not from_manifest:
+                # Retry agresif: jika fetch gagal, coba ulang hingga 3x
+                detail = None
+                for _retry in range(3):
+                    resp = _fetch_detail(item["detail_url"])
+                    if resp is not None and not resp.is_success:
+                        break  # 4xx permanen: retry tidak akan menolong
+                    if resp is not None:
+                        detail = parse_pool.submit(parse_detail, item["detail_url"],
+                                                   resp.content, resp.charset_encoding).result()
+                    if detail:
+                        break
+                    if _retry < 2:
+                        time.sleep(_backoff_delay(_retry))
 
             if not detail:
-                with lock_detail:
-                    completed_detail[0] += 1
-                    log.error(f"  ✗ [{completed_detail[0]}/{total}] SKIP: Gagal scrape {item['title'] or item['slug']}")
+                log.error(f"  ✗ [{next(completed_detail)}/{total}] SKIP: Gagal scrape {item['title'] or item['slug']}")
                 return
 
+            if not from_manifest:
+                with lock_detail:
+                    manifest.execute("INSERT OR REPLACE INTO scraped VALUES (?, ?, ?)",
+                                     (item["slug"], int(time.time()),
+                                      orjson.dumps(detail).decode()))
+                    manifest.commit()
+
             # Merge listing info
             detail["listing_poster"] = item.get("poster", "")
             detail["listing_rating"] = item.get("rating", "")
             detail["_detail_url"] = item["detail_url"]  # Simpan URL untuk Playwright nanti
             
-            with lock_detail:
-                details.append(detail)
-                completed_detail[0] += 1
-                log.info(f"  ✓ [{completed_detail[0]}/{total}] {item['title'] or item['slug']}")
+            io_pool.submit(_append_line, jsonl_file, orjson.dumps(detail) + b"\n")
+            if scrape_episodes:
+                details.append(detail)  # list.append atomik di bawah GIL
+            next(scraped)
+            log.info(f"  {'↺' if from_manifest else '✓'} [{next(completed_detail)}/{total}] "
+                     f"{item['title'] or item['slug']}{' (manifest)' if from_manifest else ''}")
 
         except Exception as e:
-            with lock_detail:
-                completed_detail[0] += 1
-                log.error(f"  ✗ [{completed_detail[0]}/{total}] Error: {e}")
+            log.error(f"  ✗ [{next(completed_detail)}/{total}] Error: {e}")
 
     tasks_detail = list(enumerate(all_items[:total], 1))
     
-    # Gunakan max 10 workers untuk paralel request HTTP yang lebih cepat
-    with ThreadPoolExecutor(max_workers=10) as executor:
+    # Satu worker per slot HTTP: request paralel dibatasi _HTTP_SLOTS
+    with ThreadPoolExecutor(max_workers=HTTP_CONCURRENCY) as executor:
         futures_detail = {executor.submit(_scrape_detail_worker, t): t for t in tasks_detail}
         try:
             for future in as_completed(futures_detail):
@@ -868,56 +1858,111 @@ def run_full_scrape(max_pages: int = None, scrape_episodes: bool = False,
         except KeyboardInterrupt:
             log.warning(f"\n⚠ Dihentikan oleh user (Ctrl+C). Menyimpan data sementara...")
             executor.shutdown(wait=False, cancel_futures=True)
+            parse_pool.shutdown(wait=False, cancel_futures=True)
 
-    log.info(f"\n✓ Total {len(details)} detail berhasil di-scrape\n")
+    parse_pool.shutdown()
+    io_pool.submit(jsonl_file.close)
+    manifest.close()
+    scraped_count = next(scraped)  # jumlah next() sebelumnya
+    log.info(f"\n✓ Total {scraped_count} detail berhasil di-scrape\n")
 
     # Step 3: Scrape episode embeds PARALEL (Max 10 browser sekaligus)
     if scrape_episodes and details:
-        from concurrent.futures import ThreadPoolExecutor, as_completed
-        import threading
 
-        PARALLEL_WORKERS = min(len(details), 10)  # Max 10 browser sekaligus
+        # Judul hasil --resume sudah punya episode_embeds lengkap
+        pending = [t for t in enumerate(details) if not t[1].get("episode_embeds")]
+        PARALLEL_WORKERS = max(1, min(len(pending), 10))  # Max 10 browser sekaligus
         log.info(f"LANGKAH 3: Scrape episode embeds PARALEL ({PARALLEL_WORKERS} browser)...")
-        log.info(f"  📋 {len(details)} judul antrian, {PARALLEL_WORKERS} browser bekerja bersamaan.\n")
-
-        lock = threading.Lock()
-        completed = [0]
-
-        def _scrape_one(args):
-            """Worker: scrape episode embed untuk 1 judul."""
-            idx, detail = args
+        log.info(f"  📋 {len(pending)} judul antrian, {PARALLEL_WORKERS} browser bekerja bersamaan.\n")
+
+        completed = itertools.count(1)
+        task_queue = queue.Queue()
+        for t in pending:
+            task_queue.put(t)
+        stop = threading.Event()
+        # Hasil episode tiap judul langsung di-append ({url, episode_embeds})
+        # begitu selesai; checkpoint penuh tetap ditulis per CHECKPOINT_EVERY judul.
+        # --resume setelah crash menimpakan baris ini ke checkpoint terakhir
+        episodes_jsonl = open(episodes_jsonl_path, "wb")
+
+        def _scrape_one(args, episode_browser):
+            """Scrape episode embed untuk 1 judul memakai EpisodeBrowser milik thread ini."""
+            _, detail = args
             url = detail.get("_detail_url", detail.get("url", ""))
             title = detail.get("title", "?")
             ep_count = detail.get("total_episodes", 0) or 0
 
             try:
-                ep_data = scrape_episodes_with_browser(url, max(ep_count, 20), quiet=True)
+                # Film dengan iframe di HTML statis tidak perlu browser
+                ep_data = episodes_from_static(detail)
+                if ep_data is None and episode_browser is not None:
+                    ep_data = episode_browser.scrape(url, max(ep_count, 20), quiet=True)
+                elif ep_data is None:
+                    ep_data = scrape_episodes_with_browser(url, max(ep_count, 20), quiet=True)
                 detail["episode_embeds"] = ep_data
+                io_pool.submit(_append_line, episodes_jsonl,
+                               orjson.dumps({"url": detail.get("url", url),
+                                             "episode_embeds": ep_data}) + b"\n")
 
                 # Hitung berapa episode yang benar-benar punya embed
                 valid = sum(1 for e in ep_data if e.get("video_embed"))
                 label = "🎬 Movie" if len(ep_data) <= 1 else f"📺 {valid}/{len(ep_data)} ep"
 
-                with lock:
-                    completed[0] += 1
-                    log.info(f"  ✓ [{completed[0]}/{len(details)}] {title} — {label}")
+                n = next(completed)
+                log.info(f"  ✓ [{n}/{len(pending)}] {title} — {label}")
+                if n % CHECKPOINT_EVERY == 0:
+                    io_pool.submit(_write_checkpoint, checkpoint_path, details)
 
             except Exception as e:
-                with lock:
-                    completed[0] += 1
-                    log.error(f"  ✗ [{completed[0]}/{len(details)}] {title} — Error: {e}")
+                log.error(f"  ✗ [{next(completed)}/{len(pending)}] {title} — Error: {e}")
                 detail["episode_embeds"] = []
 
+        def _next_task():
+            if stop.is_set():
+                return None
+            try:
+                return task_queue.get_nowait()
+            except queue.Empty:
+                return None
+
+        def _browser_worker():
+            """Worker: launch 1 browser lalu pakai ulang untuk semua judul di antrian.
+            Playwright sync API terikat ke thread, jadi browser tidak bisa dibagi
+            antar thread — yang dihemat adalah launch per judul."""
+            episode_browser = EpisodeBrowser()
+            try:
+                episode_browser.start()
+            except Exception as e:
+                # scrape_episodes_with_browser yang menangani install otomatis;
+                # launch yang gagal di sana hanya menggagalkan judul itu
+                if not isinstance(e, ImportError):
+                    log.error(f"  ✗ Browser worker gagal start: {e}")
+                while (t := _next_task()) is not None:
+                    _scrape_one(t, None)
+                return
+
+            try:
+                while (t := _next_task()) is not None:
+                    # Launch/recycle yang gagal di ensure_browser tertangkap
+                    # di _scrape_one: hanya judul ini yang gagal
+                    _scrape_one(t, episode_browser)
+            finally:
+                try:
+                    episode_browser.close()
+                except Exception as e:
+                    log.warning(f"  ⚠ Gagal menutup browser worker: {e}")
+
         # Jalankan paralel
-        tasks = list(enumerate(details))
         with ThreadPoolExecutor(max_workers=PARALLEL_WORKERS) as executor:
-            futures = {executor.submit(_scrape_one, t): t for t in tasks}
+            futures = [executor.submit(_browser_worker) for _ in range(PARALLEL_WORKERS)]
             try:
                 for future in as_completed(futures):
                     future.result()  # Propagate exceptions
             except KeyboardInterrupt:
                 log.warning("\n⚠ Dihentikan oleh user (Ctrl+C)")
+                stop.set()
                 executor.shutdown(wait=False, cancel_futures=True)
+        io_pool.submit(episodes_jsonl.close)
 
         log.info(f"\n✓ Scraping paralel selesai\n")
 
@@ -926,149 +1971,154 @@ def run_full_scrape(max_pages: int = None, scrape_episodes: bool = False,
         # ══════════════════════════════════════════════════════════
         MAX_VERIFY_ROUNDS = 3
 
-        for verify_round in range(1, MAX_VERIFY_ROUNDS + 1):
-            # Cari episode yang kosong DAN film yang gagal total
-            missing = []
-            fully_failed = []
-            for detail in details:
-                url = detail.get("_detail_url", detail.get("url", ""))
-                title = detail.get("title", "?")
-                ep_embeds = detail.get("episode_embeds", [])
-
-                # Film yang gagal total (episode_embeds kosong/tidak ada)
-                if not ep_embeds or (isinstance(ep_embeds, list) and len(ep_embeds) == 0):
-                    fully_failed.append({
-                        "detail": detail,
-                        "url": url,
-                        "title": title,
-                    })
-                    continue
-
-                # Film yang sebagian episode-nya kosong
-                empty_eps = []
-                for ep_idx, ep in enumerate(ep_embeds):
-                    if not ep.get("video_embed"):
-                        empty_eps.append((ep_idx, ep.get("episode", "?")))
-
-                if empty_eps:
-                    missing.append({
-                        "detail": detail,
-                        "url": url,
-                        "title": title,
-                        "empty_eps": empty_eps,
-                    })
-
-            if not missing and not fully_failed:
-                log.info(f"✅ VERIFIKASI: Semua episode lengkap 100%!")
-                break
-
-            total_missing = sum(len(m["empty_eps"]) for m in missing)
-            log.info(f"🔍 VERIFIKASI Ronde {verify_round}/{MAX_VERIFY_ROUNDS}: "
-                     f"{total_missing} episode kosong di {len(missing)} judul, "
-                     f"{len(fully_failed)} judul gagal total. Retry...")
-
-            # Re-scrape film yang gagal total (dari awal)
-            for ff in fully_failed:
-                detail = ff["detail"]
-                url = ff["url"]
-                title = ff["title"]
-                ep_count = detail.get("total_episodes", 0) or 0
-
-                log.info(f"  🔄 {title} — re-scrape dari awal...")
-                try:
-                    ep_data = scrape_episodes_with_browser(url, max(ep_count, 20), quiet=False)
-                    detail["episode_embeds"] = ep_data
-                    valid = sum(1 for e in ep_data if e.get("video_embed"))
-                    label = "🎬 Movie" if len(ep_data) <= 1 else f"📺 {valid}/{len(ep_data)} ep"
-                    log.info(f"    ✓ {title} — {label}")
-                except Exception as e:
-                    log.error(f"    ✗ {title} — Error: {e}")
-
-            # Re-scrape episode spesifik yang kosong
-            for m in missing:
-                detail = m["detail"]
-                url = m["url"]
-                title = m["title"]
-                empty_eps = m["empty_eps"]
-
-                log.info(f"  🔄 {title} — retry {len(empty_eps)} episode: "
-                         f"{', '.join(e[1] for e in empty_eps)}")
-
-                try:
-                    from playwright.sync_api import sync_playwright
+        # Satu browser untuk semua ronde verifikasi; per judul cukup context baru
+        verify_browser = EpisodeBrowser()
+        try:
+            verify_browser.start()
+        except Exception as e:
+            # Playwright belum terinstall / gagal start: per judul lewat
+            # scrape_episodes_with_browser (yang menangani install otomatis)
+            if not isinstance(e, ImportError):
+                log.error(f"  ✗ Browser verifikasi gagal start: {e}")
+            verify_browser = None
+
+        # URL & judul tidak berubah antar ronde: array paralel dengan `details`
+        urls = [d.get("_detail_url", d.get("url", "")) for d in details]
+        titles = [d.get("title", "?") for d in details]
+        # Index judul yang satu ronde penuh tanpa kemajuan: tidak di-retry lagi
+        dead = set()
+        # Context bersama untuk retry per episode: per judul cukup tab baru.
+        # Dibuat ulang hanya jika browser di-launch ulang (recycle/crash)
+        verify_ctx = None
+
+        def _empty_eps(eps):
+            return [(ep_idx, ep.get("episode", "?")) for ep_idx, ep in enumerate(eps)
+                    if not ep.get("video_embed")]
+
+        # Satu pass di awal: index film gagal total (episode_embeds kosong) dan
+        # (index, [(ep_idx, label)]) untuk film yang sebagian episode-nya kosong.
+        # Ronde berikutnya memakai sisa hasil retry, tanpa scan ulang `details`
+        embeds = [d.get("episode_embeds") or [] for d in details]
+        fully_failed = [i for i, eps in enumerate(embeds) if not eps]
+        missing = [(i, empty_eps) for i, eps in enumerate(embeds)
+                   if (empty_eps := _empty_eps(eps))]
 
-                    with sync_playwright() as p:
-                        browser = p.chromium.launch()
-                        ctx = browser.new_context(
-                            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                                       "AppleWebKit/537.36 Chrome/120.0.0.0 Safari/537.36"
-                        )
-                        page = ctx.new_page()
+        try:
+            for verify_round in range(1, MAX_VERIFY_ROUNDS + 1):
+                if not missing and not fully_failed:
+                    if not dead:
+                        log.info(f"✅ VERIFIKASI: Semua episode lengkap 100%!")
+                    break
 
+                total_missing = sum(len(empty_eps) for _, empty_eps in missing)
+                log.info(f"🔍 VERIFIKASI Ronde {verify_round}/{MAX_VERIFY_ROUNDS}: "
+                         f"{total_missing} episode kosong di {len(missing)} judul, "
+                         f"{len(fully_failed)} judul gagal total. Retry...")
+
+                next_missing = []
+
+                # Re-scrape film yang gagal total (dari awal)
+                for i in fully_failed:
+                    detail, url, title = details[i], urls[i], titles[i]
+                    ep_count = detail.get("total_episodes", 0) or 0
+
+                    log.info(f"  🔄 {title} — re-scrape dari awal...")
+                    try:
+                        if verify_browser is not None:
+                            ep_data = verify_browser.scrape(url, max(ep_count, 20), quiet=False)
+                        else:
+                            ep_data = scrape_episodes_with_browser(url, max(ep_count, 20), quiet=False)
+                        detail["episode_embeds"] = ep_data
+                        valid = sum(1 for e in ep_data if e.get("video_embed"))
+                        label = "🎬 Movie" if len(ep_data) <= 1 else f"📺 {valid}/{len(ep_data)} ep"
+                        log.info(f"    ✓ {title} — {label}")
+                        if not ep_data:
+                            dead.add(i)
+                        elif empty_eps := _empty_eps(ep_data):
+                            next_missing.append((i, empty_eps))
+                    except Exception as e:
+                        log.error(f"    ✗ {title} — Error: {e}")
+                        dead.add(i)
+
+                # Re-scrape episode spesifik yang kosong
+                for i, empty_eps in missing:
+                    detail, url, title = details[i], urls[i], titles[i]
+
+                    log.info(f"  🔄 {title} — retry {len(empty_eps)} episode: "
+                             f"{', '.join(e[1] for e in empty_eps)}")
+                    filled = set()
+
+                    try:
+                        if verify_browser is None:
+                            raise ImportError("playwright tidak terinstall")
+                        browser = verify_browser.ensure_browser()
+                        if verify_ctx is None or verify_ctx.browser is not browser:
+                            verify_ctx = browser.new_context(
+                                user_agent=HEADERS["User-Agent"],
+                                viewport={"width": 1024, "height": 768},
+                            )
+                            # Sama seperti LANGKAH 3: iklan, gambar, font, CSS, media tidak dimuat
+                            verify_ctx.route("**/*", _block_heavy_requests)
+                            verify_ctx.add_init_script(JS_NO_AUTOPLAY)
                         try:
-                            page.goto(url, wait_until="domcontentloaded", timeout=25000)
-                        except Exception:
-                            pass
-
-                        # Tunggu tombol episode
-                        for _ in range(20):
-                            cnt = page.evaluate(
-                                """() => document.querySelectorAll('.btn-svr').length""")
-                            if cnt > 0:
-                                break
-                            page.wait_for_timeout(1000)
-
-                        ad_domains = ['dtscout.com', 'doubleclick', 'googlesyndication', 'adnxs.com']
-
-                        for ep_idx, ep_text in empty_eps:
-                            # Klik tombol episode yang spesifik
-                            page.evaluate(f"""(idx) => {{
-                                const btns = document.querySelectorAll('.btn-svr');
-                                if (btns[idx]) btns[idx].click();
-                            }}""", ep_idx)
-
-                            # Tunggu dan ambil iframe dengan retry
-                            src = ""
-                            for _retry in range(3):
-                                page.wait_for_timeout(3000)
-                                src = page.evaluate("""() => {
-                                    const iframe = document.querySelector('iframe');
-                                    return (iframe && iframe.src && !iframe.src.startsWith('about:'))
-                                           ? iframe.src : '';
-                                }""")
-                                is_ad = any(ad in src.lower() for ad in ad_domains) if src else False
-                                if src and not is_ad:
-                                    break
-                                # Re-click
-                                page.evaluate(f"""(idx) => {{
-                                    const btns = document.querySelectorAll('.btn-svr');
-                                    if (btns[idx]) btns[idx].click();
-                                }}""", ep_idx)
-
-                            is_ad = any(ad in src.lower() for ad in ad_domains) if src else False
-                            clean_src = src if (src and not is_ad) else ""
-
-                            if clean_src:
-                                detail["episode_embeds"][ep_idx]["video_embed"] = clean_src
-                                log.info(f"    ✓ Ep {ep_text}: {clean_src[:50]}...")
-                            else:
-                                log.warning(f"    ✗ Ep {ep_text}: masih gagal")
-
-                        browser.close()
-
-                except Exception as e:
-                    log.error(f"  ✗ Verifikasi {title} error: {e}")
-        else:
-            # Setelah semua ronde selesai, tampilkan sisa yang masih kosong
-            remaining = 0
-            for detail in details:
-                for ep in detail.get("episode_embeds", []):
-                    if not ep.get("video_embed"):
-                        remaining += 1
-            if remaining > 0:
-                log.warning(f"⚠ {remaining} episode masih kosong setelah {MAX_VERIFY_ROUNDS} ronde verifikasi.")
+                            page = verify_ctx.new_page()
+
+                            try:
+                                # "commit": tidak menunggu DOM selesai; tombol episode ditunggu di bawah
+                                page.goto(url, wait_until="commit", timeout=25000)
+                            except Exception:
+                                pass
+
+                            # Tunggu tombol episode (selesai begitu elemen ada)
+                            try:
+                                page.wait_for_selector(".btn-svr", state="attached", timeout=20000)
+                            except Exception:
+                                pass
+
+                            # Satu round-trip untuk semua episode kosong judul ini
+                            results = page.evaluate(JS_RETRY_EPISODES,
+                                                    [[idx for idx, _ in empty_eps], AD_DOMAINS])
+                            ep_labels = dict(empty_eps)
+                            for r in results:
+                                ep_idx, src = r["i"], r["src"]
+                                ep_text = ep_labels[ep_idx]
+                                clean_src = src if (src and not _is_ad(src)) else ""
+
+                                if clean_src:
+                                    detail["episode_embeds"][ep_idx]["video_embed"] = clean_src
+                                    filled.add(ep_idx)
+                                    log.info(f"    ✓ Ep {ep_text}: {clean_src[:50]}...")
+                                else:
+                                    log.warning(f"    ✗ Ep {ep_text}: masih gagal")
+                        finally:
+                            # Tab judul ini (+ popup iklan) ditutup; context tetap dipakai
+                            for p in verify_ctx.pages:
+                                p.close()
+
+                    except Exception as e:
+                        log.error(f"  ✗ Verifikasi {title} error: {e}")
+
+                    if not filled:
+                        dead.add(i)
+                    elif len(filled) < len(empty_eps):
+                        next_missing.append((i, [e for e in empty_eps if e[0] not in filled]))
+
+                # Gagal total yang tetap kosong sudah masuk `dead`
+                fully_failed, missing = [], next_missing
             else:
-                log.info(f"✅ VERIFIKASI: Semua episode lengkap 100% setelah {MAX_VERIFY_ROUNDS} ronde!")
+                # Setelah semua ronde selesai, tampilkan sisa yang masih kosong
+                remaining = sum(1 for d in details for ep in d.get("episode_embeds") or []
+                                if not ep.get("video_embed"))
+                if remaining > 0:
+                    log.warning(f"⚠ {remaining} episode masih kosong setelah {MAX_VERIFY_ROUNDS} ronde verifikasi.")
+                else:
+                    log.info(f"✅ VERIFIKASI: Semua episode lengkap 100% setelah {MAX_VERIFY_ROUNDS} ronde!")
+            if dead:
+                log.warning(f"⚠ {len(dead)} judul dihentikan verifikasinya (ronde tanpa kemajuan): "
+                            f"{', '.join(titles[i] for i in sorted(dead))}")
+        finally:
+            if verify_browser is not None:
+                verify_browser.close()
 
         # Hapus field sementara
         for d in details:
@@ -1077,22 +2127,29 @@ def run_full_scrape(max_pages: int = None, scrape_episodes: bool = False,
         log.info(f"\n✓ Semua episode selesai di-scrape & diverifikasi\n")
 
     # Step 4: Simpan semua detail
-    full_path = os.path.join(OUTPUT_DIR, f"drakorkita_full_{timestamp}.json")
-    with open(full_path, "w", encoding="utf-8") as f:
-        json.dump({
-            "metadata": {
-                "source": BASE_URL,
-                "scrape_date": datetime.now().isoformat(),
-                "total_titles_scraped": len(details),
-                "episodes_scraped": scrape_episodes,
-            },
-            "dramas": details
-        }, f, ensure_ascii=False, indent=2, default=str)
+    metadata = {
+        "source": BASE_URL,
+        "scrape_date": datetime.now().isoformat(),
+        "total_titles_scraped": scraped_count,
+        "episodes_scraped": scrape_episodes,
+    }
+    if scrape_episodes:
+        # Detail sudah diperkaya episode_embeds (dan hasil verifikasi) di memori
+        final_write = io_pool.submit(_write_full_json, full_path, metadata, details)
+    else:
+        final_write = io_pool.submit(_write_full_json, full_path, metadata,
+                                     _read_jsonl(jsonl_path))
+    final_write.result()
+    io_pool.shutdown()
+    os.remove(jsonl_path)
+    for tmp_path in (checkpoint_path, episodes_jsonl_path):
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
 
     size_mb = round(os.path.getsize(full_path) / (1024 * 1024), 2)
     log.info(f"{'═'*60}")
     log.info(f"✓ SELESAI!")
-    log.info(f"  Total judul: {len(details)}")
+    log.info(f"  Total judul: {scraped_count}")
     log.info(f"  File: {full_path}")
     log.info(f"  Ukuran: {size_mb} MB")
     log.info(f"{'═'*60}")
@@ -1115,14 +2172,15 @@ def quick_scrape(url: str, with_episodes: bool = False) -> dict | None:
 
     if with_episodes and detail.get("total_episodes", 0) > 0:
         log.info(f"  → Scraping {detail['total_episodes']} episode embeds...")
-        detail["episode_embeds"] = scrape_episodes_with_browser(url, detail["total_episodes"])
+        detail["episode_embeds"] = (episodes_from_static(detail)
+                                    or scrape_episodes_with_browser(url, detail["total_episodes"]))
 
     # Simpan
     slug = url.rstrip("/").split("/")[-1]
     timestamp = int(time.time())
     out_path = os.path.join(OUTPUT_DIR, f"{slug}_{timestamp}.json")
-    with open(out_path, "w", encoding="utf-8") as f:
-        json.dump(detail, f, ensure_ascii=False, indent=2, default=str)
+    with open(out_path, "wb") as f:
+        f.write(orjson.dumps(detail, option=orjson.OPT_INDENT_2))
 
     size_kb = round(os.path.getsize(out_path) / 1024, 1)
     log.info(f"✓ Disimpan: {out_path} ({size_kb} KB)")
@@ -1144,8 +2202,17 @@ if __name__ == "__main__":
     parser.add_argument("--status", choices=["ended", "returning series"], help="Filter status")
     parser.add_argument("--genre", help="Filter genre (misal: Romance)")
     parser.add_argument("--year", help="Filter tahun (misal: 2026)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Lewati judul yang sudah lengkap di file drakorkita_full_*.json "
+                             "(atau checkpoint run yang crash) terakhir")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Scrape ulang semua detail (abaikan manifest judul yang masih segar)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Jangan baca/tulis cache HTTP di disk (selalu request ke server)")
 
     args = parser.parse_args()
+    if args.no_cache:
+        HTTP_CACHE_ENABLED = False
 
     if args.url:
         quick_scrape(args.url, with_episodes=args.with_episodes)
@@ -1165,4 +2232,6 @@ if __name__ == "__main__":
             scrape_episodes=args.with_episodes,
             max_details=args.max_details,
             filter_params=params if params else None,
+            force_refresh=args.refresh,
+            resume=args.resume,
         )
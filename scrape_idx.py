@@ -1,8 +1,11 @@
 import os
 import sys
-import json
+import orjson
 import time
 import logging
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
 from playwright.sync_api import sync_playwright
 
 # Inisialisasi Project (Path system)
@@ -11,6 +14,7 @@ if sys_path not in sys.path:
     sys.path.append(sys_path)
 
 from config import settings
+from json_io import write_json
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +24,10 @@ API_STOCKS_URL = "https://www.idx.co.id/primary/StockData/GetSecuritiesStock?sta
 API_SUMMARY_URL = "https://www.idx.co.id/primary/TradingSummary/GetStockSummary?start=0&length=9999"
 API_BROKER_URL = "https://www.idx.co.id/primary/TradingSummary/GetBrokerSummary?start=0&length=9999"
 
+# fetch() paralel dari dalam halaman; kegagalan per URL → {error}
+JS_FETCH_ALL = """async (urls) => Promise.all(urls.map(u =>
+    fetch(u).then(r => r.json()).catch(e => ({error: e.toString()}))))"""
+
 def _get_browser_path():
     """Cari lokasi browser chromium di sistem sebagai fallback."""
     for p in ["/usr/bin/chromium", "/usr/bin/chromium-browser",
@@ -30,6 +38,32 @@ def _get_browser_path():
             return p
     return None
 
+def _fetch_idx_apis_direct(cookies: list, user_agent: str, proxy: str | None) -> list | None:
+    """Tiga API IDX via requests (paralel) memakai cookie sesi dari browser.
+    None jika salah satu diblokir (bukan 200 / bukan JSON): pemanggil lalu
+    fetch dari dalam browser seperti biasa."""
+    session = requests.Session()
+    for c in cookies:
+        session.cookies.set(c["name"], c["value"], domain=c.get("domain"), path=c.get("path", "/"))
+    session.headers.update({"User-Agent": user_agent, "Referer": IDX_BASE_URL,
+                            "Accept": "application/json"})
+    if proxy:
+        session.proxies.update({"http": proxy, "https": proxy})
+
+    def _get(url):
+        resp = session.get(url, timeout=30)
+        resp.raise_for_status()
+        return orjson.loads(resp.content)
+
+    try:
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            return list(executor.map(_get, [API_STOCKS_URL, API_SUMMARY_URL, API_BROKER_URL]))
+    except (requests.RequestException, ValueError) as e:
+        logger.info(f"Fetch API langsung gagal ({e}), pakai fetch dari dalam browser...")
+        return None
+    finally:
+        session.close()
+
 def fetch_idx_data_via_browser() -> dict:
     """Menggunakan browser secara native untuk fetch API tanpa repot curi token."""
     logger.info("Membuka sesi Browser (Playwright) untuk scrape data IDX...")
@@ -41,103 +75,127 @@ def fetch_idx_data_via_browser() -> dict:
     from modules.proxy_manager import proxy_manager
 
     with sync_playwright() as p:
-        base_launch_kwargs = {
+        launch_kwargs = {
             "headless": settings.HEADLESS,
             "args": ["--disable-blink-features=AutomationControlled"]
         }
         
         sys_browser = _get_browser_path()
         if sys_browser:
-            base_launch_kwargs["executable_path"] = sys_browser
+            launch_kwargs["executable_path"] = sys_browser
 
         pw_proxies = proxy_manager.get_all_playwright_proxies()
         if not pw_proxies:
             pw_proxies = [None]
 
-        for idx, pw_proxy in enumerate(pw_proxies):
-            launch_kwargs = base_launch_kwargs.copy()
-            if pw_proxy:
-                launch_kwargs["proxy"] = pw_proxy
-                logger.info(f"[{idx+1}/{len(pw_proxies)}] Mencoba Playwright Proxy: {pw_proxy['server']}")
-            else:
-                logger.info("Mencoba Playwright tanpa proxy...")
-
+        # Browser di-launch sekali; proxy dipasang per context, sehingga
+        # pergantian proxy tidak membayar cold start Chromium lagi
+        try:
+            browser = p.chromium.launch(**launch_kwargs)
+        except Exception:
+            launch_kwargs.pop("executable_path", None)
             try:
                 browser = p.chromium.launch(**launch_kwargs)
-            except Exception:
-                launch_kwargs.pop("executable_path", None)
+            except Exception as e:
+                logger.error(f"Gagal meluncurkan browser: {e}")
+                browser = None
+                pw_proxies = []
+
+        try:
+            for idx, pw_proxy in enumerate(pw_proxies):
+                context_kwargs = {
+                    "viewport": {"width": 1920, "height": 1080},
+                    "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+                }
+                if pw_proxy:
+                    context_kwargs["proxy"] = pw_proxy
+                    logger.info(f"[{idx+1}/{len(pw_proxies)}] Mencoba Playwright Proxy: {pw_proxy['server']}")
+                else:
+                    logger.info("Mencoba Playwright tanpa proxy...")
+
                 try:
-                    browser = p.chromium.launch(**launch_kwargs)
+                    context = browser.new_context(**context_kwargs)
                 except Exception as e:
-                    logger.error(f"Gagal meluncurkan browser: {e}")
+                    logger.error(f"Gagal membuat context browser: {e}")
                     continue
-                
-            context = browser.new_context(
-                viewport={"width": 1920, "height": 1080},
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-            )
-            context.add_init_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-            page = context.new_page()
+                context.add_init_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+                page = context.new_page()
 
-            try:
-                logger.info("Mengakses homepage IDX untuk mendapatkan otentikasi...")
-                page.goto(IDX_BASE_URL, timeout=40000, wait_until="networkidle")
-                page.wait_for_timeout(3000)
-
-                # --- FETCH 1: DAFTAR SAHAM ---
-                logger.info("Mengeksekusi native fetch ke API Daftar Saham...")
-                stocks_meta_res = page.evaluate(f'''async () => {{
-                    try {{
-                        const res = await fetch("{API_STOCKS_URL}");
-                        return await res.json();
-                    }} catch (e) {{ return {{error: e.toString()}}; }}
-                }}''')
-                if not stocks_meta_res.get("error"):
-                    stocks_meta_data = stocks_meta_res.get("data", [])
-                    logger.info(f" ✓ {len(stocks_meta_data)} emiten saham berhasil diunduh.")
-
-                # --- FETCH 2: RINGKASAN PERDAGANGAN ---
-                logger.info("Mengeksekusi native fetch ke API Ringkasan Perdagangan...")
-                stocks_summary_res = page.evaluate(f'''async () => {{
-                    try {{
-                        const res = await fetch("{API_SUMMARY_URL}");
-                        return await res.json();
-                    }} catch (e) {{ return {{error: e.toString()}}; }}
-                }}''')
-                if not stocks_summary_res.get("error"):
-                    stocks_summary_data = stocks_summary_res.get("data", [])
-                    logger.info(f" ✓ {len(stocks_summary_data)} ringkasan saham berhasil diunduh.")
-
-                # --- FETCH 3: RINGKASAN BROKER ---
-                logger.info("Mengeksekusi native fetch ke API Ringkasan Broker...")
-                broker_summary_res = page.evaluate(f'''async () => {{
-                    try {{
-                        const res = await fetch("{API_BROKER_URL}");
-                        return await res.json();
-                    }} catch (e) {{ return {{error: e.toString()}}; }}
-                }}''')
-                if not broker_summary_res.get("error"):
-                    broker_summary_data = broker_summary_res.get("data", [])
-                    logger.info(f" ✓ {len(broker_summary_data)} ringkasan broker berhasil diunduh.")
+                try:
+                    logger.info("Mengakses homepage IDX untuk mendapatkan otentikasi...")
+                    page.goto(IDX_BASE_URL, timeout=40000, wait_until="networkidle")
+                    page.wait_for_timeout(3000)
+
+                    # Browser cukup untuk otentikasi: cookie sesi dipakai requests
+                    logger.info("Mengambil API IDX langsung dengan cookie sesi browser...")
+                    direct = _fetch_idx_apis_direct(context.cookies(),
+                                                    page.evaluate("navigator.userAgent"),
+                                                    pw_proxy["server"] if pw_proxy else None)
+                    if direct is not None:
+                        stocks_meta_res, stocks_summary_res, broker_summary_res = direct
+                    else:
+                        # Tiga fetch sekaligus dalam satu evaluate (Promise.all)
+                        logger.info("Mengeksekusi native fetch ke API Daftar Saham, Ringkasan Perdagangan & Broker...")
+                        stocks_meta_res, stocks_summary_res, broker_summary_res = page.evaluate(
+                            JS_FETCH_ALL, [API_STOCKS_URL, API_SUMMARY_URL, API_BROKER_URL])
+
+                    if not stocks_meta_res.get("error"):
+                        stocks_meta_data = stocks_meta_res.get("data", [])
+                        logger.info(f" ✓ {len(stocks_meta_data)} emiten saham berhasil diunduh.")
+                    if not stocks_summary_res.get("error"):
+                        stocks_summary_data = stocks_summary_res.get("data", [])
+                        logger.info(f" ✓ {len(stocks_summary_data)} ringkasan saham berhasil diunduh.")
+                    if not broker_summary_res.get("error"):
+                        broker_summary_data = broker_summary_res.get("data", [])
+                        logger.info(f" ✓ {len(broker_summary_data)} ringkasan broker berhasil diunduh.")
 
-            except Exception as e:
-                logger.error(f"Terjadi kesalahan saat mengeksekusi fetch dari dalam browser: {e}")
-            finally:
+                except Exception as e:
+                    logger.error(f"Terjadi kesalahan saat mengeksekusi fetch dari dalam browser: {e}")
+                finally:
+                    context.close()
+
+                # If we successfully gathered meta data, we can stop trying other proxies
+                if stocks_meta_data:
+                    logger.info("Berhasil mengumpulkan data, menghentikan loop proxy.")
+                    break
+                else:
+                    logger.warn("Data kosong atau koneksi gagal, mencoba proxy berikutnya if available...")
+        finally:
+            if browser is not None:
                 browser.close()
 
-            # If we successfully gathered meta data, we can stop trying other proxies
-            if stocks_meta_data:
-                logger.info("Berhasil mengumpulkan data, menghentikan loop proxy.")
-                break
-            else:
-                logger.warn("Data kosong atau koneksi gagal, mencoba proxy berikutnya if available...")
-
     return {
         "metadata": stocks_meta_data,
         "summary": stocks_summary_data,
         "brokers": broker_summary_data
     }
 
+# Pemetaan field API → field output; itemgetter mengambil semua kolom sekaligus
+META_FIELDS = (("Kode", "Code", None), ("Nama_Perusahaan", "Name", ""), ("Sektor", "Sector", ""),
+               ("Papan_Pencatatan", "Board", ""), ("Saham_Beredar", "Shares", 0),
+               ("Tanggal_Pencatatan", "ListingDate", ""))
+SUMMARY_FIELDS = (("Kode", "StockCode", None), ("Harga_Tinggi", "High", 0), ("Harga_Rendah", "Low", 0),
+                  ("Harga_Tutup", "Close", 0), ("Selisih", "Change", 0),
+                  ("Persentase_Selisih", "Percentage", 0), ("Volume", "Volume", 0),
+                  ("Nilai", "Value", 0), ("Frekuensi", "Frequency", 0))
+META_KEYS = tuple(f[0] for f in META_FIELDS)
+META_GET = itemgetter(*(f[1] for f in META_FIELDS))
+META_DEFAULTS = tuple((f[1], f[2]) for f in META_FIELDS)
+SUMMARY_KEYS = tuple(f[0] for f in SUMMARY_FIELDS[1:])
+SUMMARY_GET = itemgetter(*(f[1] for f in SUMMARY_FIELDS))
+SUMMARY_DEFAULTS = tuple((f[1], f[2]) for f in SUMMARY_FIELDS)
+
+
+def _pluck(rows, getter, defaults):
+    """Tuple kolom per baris. Jalur cepat itemgetter; baris yang tidak lengkap
+    jatuh ke dict.get dengan nilai default."""
+    for s in rows:
+        try:
+            yield getter(s)
+        except KeyError:
+            yield tuple(s.get(k, d) for k, d in defaults)
+
+
 def scrape_idx_all() -> dict:
     """Fungsi pembungkus untuk memproses data mentah dari native fetch."""
     
@@ -147,38 +205,15 @@ def scrape_idx_all() -> dict:
         return None
 
     logger.info("Memproses dan menggabungkan data...")
-    combined_stocks = {}
-
-    # Masukkan metadata dulu (Kode, Nama, Papan, Saham_Beredar)
-    for s in raw["metadata"]:
-        code = s.get("Code")
-        if code:
-            combined_stocks[code] = {
-                "Kode": code,
-                "Nama_Perusahaan": s.get("Name", ""),
-                "Sektor": s.get("Sector", ""),
-                "Papan_Pencatatan": s.get("Board", ""),
-                "Saham_Beredar": s.get("Shares", 0),
-                "Tanggal_Pencatatan": s.get("ListingDate", "")
-            }
-
-    # Merge dengan data trading (Harga, Volume, Nilai)
-    for s in raw["summary"]:
-        code = s.get("StockCode")
+    # Metadata dulu (Kode, Nama, Papan, Saham_Beredar), lalu merge data trading
+    combined_stocks = {
+        row[0]: dict(zip(META_KEYS, row))
+        for row in _pluck(raw["metadata"], META_GET, META_DEFAULTS) if row[0]
+    }
+    for row in _pluck(raw["summary"], SUMMARY_GET, SUMMARY_DEFAULTS):
+        code = row[0]
         if code:
-            if code not in combined_stocks:
-                combined_stocks[code] = {"Kode": code}
-                
-            combined_stocks[code].update({
-                "Harga_Tinggi": s.get("High", 0),
-                "Harga_Rendah": s.get("Low", 0),
-                "Harga_Tutup": s.get("Close", 0),
-                "Selisih": s.get("Change", 0),
-                "Persentase_Selisih": s.get("Percentage", 0),
-                "Volume": s.get("Volume", 0),
-                "Nilai": s.get("Value", 0),
-                "Frekuensi": s.get("Frequency", 0)
-            })
+            combined_stocks.setdefault(code, {"Kode": code}).update(zip(SUMMARY_KEYS, row[1:]))
 
     from datetime import datetime
     
@@ -204,8 +239,7 @@ if __name__ == "__main__":
         out_dir = os.path.join(sys_path, "hasil_scrape")
         os.makedirs(out_dir, exist_ok=True)
         out_file = os.path.join(out_dir, f"idx_combined_{int(time.time())}.json")
-        with open(out_file, "w", encoding="utf-8") as f:
-            json.dump(res, f, ensure_ascii=False, indent=2)
+        write_json(out_file, res)
         print(f"\n✅ Berhasil! Data tersimpan di: {out_file}")
         print(f"   Total Saham: {res['metadata']['total_stocks']}")
         print(f"   Total Broker: {res['metadata']['total_brokers']}")
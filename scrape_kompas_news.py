@@ -9,13 +9,14 @@ Kolom yang diekstrak per artikel:
 
 Output: hasil_scrape/kompas_news_<timestamp>.json
 """
-import json
+import orjson
 import time
 import os
 import sys
 import logging
 from datetime import datetime
-from playwright.sync_api import sync_playwright, TimeoutError as PWTimeout
+from playwright.sync_api import sync_playwright, Error as PWError, TimeoutError as PWTimeout
+from json_io import write_json
 
 # ─── Konfigurasi ─────────────────────────────────────────────────────────────
 OUTPUT_DIR = "hasil_scrape"
@@ -33,7 +34,16 @@ SECTIONS = [
     {"name": "Hiburan",    "url": "https://entertainment.kompas.com/"},
 ]
 
-DELAY_BETWEEN_PAGES = 2  # detik
+# Section dimuat bersamaan sebagai tab dalam satu context; context (heap V8,
+# proses renderer) dibuat ulang per gelombang supaya memori tidak menumpuk
+CONTEXT_RECYCLE_AFTER = 3
+
+# Ekstraksi hanya membaca DOM (thumbnail dari atribut src/data-src), jadi
+# gambar, font, CSS, dan media tidak perlu diunduh sama sekali
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "stylesheet", "media"})
+# Domain iklan/pelacak: request apa pun ke sini dibatalkan
+AD_DOMAINS = ("adserv", "doubleclick", "googlesyndication", "chartbeat",
+              "googletagmanager", "google-analytics")
 
 logging.basicConfig(
     level=logging.INFO,
@@ -42,6 +52,7 @@ logging.basicConfig(
 )
 logger = logging.getLogger("kompas_scraper")
 
+
 # ─── Browser Helper ──────────────────────────────────────────────────────────
 
 def get_browser_path():
@@ -58,6 +69,27 @@ def get_browser_path():
             return p
     return None
 
+def new_context(browser):
+    """Context baru dengan route pemblokir resource (berlaku untuk semua tab)
+    dan fungsi ekstraksi yang dipasang sekali sebagai window.__extract."""
+    context = browser.new_context(
+        user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
+        viewport={"width": 1366, "height": 768},
+        locale="id-ID"
+    )
+
+    context.route("**/*", block_heavy_requests)
+    context.add_init_script(f"window.__extract = {EXTRACT_SCRIPT};")
+    return context
+
+def block_heavy_requests(route):
+    """Route handler: batalkan resource berat dan request iklan/tracking."""
+    request = route.request
+    if (request.resource_type in BLOCKED_RESOURCE_TYPES
+            or any(ad in request.url for ad in AD_DOMAINS)):
+        return route.abort()
+    return route.continue_()
+
 # ─── Ekstraksi Artikel via JavaScript di DOM ──────────────────────────────────
 
 EXTRACT_SCRIPT = """
@@ -120,20 +152,50 @@ EXTRACT_SCRIPT = """
         }
     });
 
-    return articles;
+    // Satu string JSON: lebih ringan daripada serialisasi objek per objek lewat protokol
+    return JSON.stringify(articles);
 }
 """
 
-def scrape_section(page, section: dict) -> list:
-    """Scrape satu section/kategori Kompas."""
+# Scroll ke bawah sampai jumlah link artikel stabil 3 cek berturut-turut
+# (tiap 250 ms), maks 20 cek (~5 detik) untuk halaman infinite scroll
+SCROLL_UNTIL_STABLE_SCRIPT = """
+async () => {
+    let last = -1, stable = 0;
+    for (let i = 0; i < 20 && stable < 3; i++) {
+        window.scrollTo(0, document.body.scrollHeight);
+        await new Promise(r => setTimeout(r, 250));
+        const n = document.querySelectorAll('a[href*="/read/"]').length;
+        if (n === last) stable++;
+        else { stable = 0; last = n; }
+    }
+}
+"""
+
+def open_section(context, section: dict):
+    """Buka section di tab baru. goto "commit" langsung kembali, sehingga
+    beberapa section bisa dimuat Chromium bersamaan."""
     url  = section["url"]
     name = section["name"]
     logger.info(f"Scraping [{name}]: {url}")
 
+    page = context.new_page()
     try:
-        page.goto(url, wait_until="domcontentloaded", timeout=20000)
+        page.goto(url, wait_until="commit", timeout=20000)
     except PWTimeout:
         logger.warning(f"[{name}] Timeout saat load, mencoba lanjut...")
+    return page
+
+def scrape_section(page, section: dict) -> list:
+    """Scrape satu section/kategori Kompas yang sudah dibuka (open_section)."""
+    name = section["name"]
+
+    # goto "commit" kembali sebelum DOM selesai di-parse: tunggu dokumen
+    # lengkap dulu supaya scroll & ekstraksi tidak berjalan di DOM parsial
+    try:
+        page.wait_for_load_state("domcontentloaded", timeout=20000)
+    except PWTimeout:
+        logger.warning(f"[{name}] Timeout menunggu DOM, mencoba lanjut...")
 
     # Tunggu artikel muncul
     try:
@@ -141,13 +203,10 @@ def scrape_section(page, section: dict) -> list:
     except PWTimeout:
         pass
 
-    # Scroll untuk trigger lazy load
-    page.evaluate("window.scrollTo(0, document.body.scrollHeight * 0.5)")
-    page.wait_for_timeout(1200)
-    page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-    page.wait_for_timeout(1000)
+    # Scroll untuk trigger lazy load, selesai begitu artikel berhenti bertambah
+    page.evaluate(SCROLL_UNTIL_STABLE_SCRIPT)
 
-    articles = page.evaluate(EXTRACT_SCRIPT)
+    articles = orjson.loads(page.evaluate("() => window.__extract()"))
 
     # Tambahkan info section ke tiap artikel
     for art in articles:
@@ -158,14 +217,11 @@ def scrape_section(page, section: dict) -> list:
 
 
 def deduplicate(articles: list) -> list:
-    """Hapus duplikat berdasarkan URL."""
-    seen = set()
-    result = []
+    """Hapus duplikat berdasarkan URL (kemunculan pertama menang, urutan tetap)."""
+    unique = {}
     for art in articles:
-        if art["url"] not in seen:
-            seen.add(art["url"])
-            result.append(art)
-    return result
+        unique.setdefault(art["url"], art)
+    return list(unique.values())
 
 
 def main():
@@ -190,23 +246,21 @@ def main():
         except Exception as e:
             logger.warning(f"Gagal launch browser: {e}. Mencoba tanpa executable_path...")
             browser = p.chromium.launch(headless=True)
-        context = browser.new_context(
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
-            viewport={"width": 1366, "height": 768},
-            locale="id-ID"
-        )
-        page = context.new_page()
-
-        # Blokir resource yang tidak perlu (iklan, tracking)
-        page.route("**/*.{png,jpg,jpeg,gif,svg,woff,woff2,ttf,css}",
-                   lambda r: r.abort() if any(x in r.request.url for x in
-                   ["ads", "adserv", "doubleclick", "googlesynd", "chartbeat"]) else r.continue_())
-
-        for i, section in enumerate(SECTIONS):
-            articles = scrape_section(page, section)
-            all_articles.extend(articles)
-            if i < len(SECTIONS) - 1:
-                time.sleep(DELAY_BETWEEN_PAGES)
+        for start in range(0, len(SECTIONS), CONTEXT_RECYCLE_AFTER):
+            batch = SECTIONS[start:start + CONTEXT_RECYCLE_AFTER]
+            context = new_context(browser)
+            try:
+                # Semua tab gelombang ini dinavigasi dulu, lalu diekstrak berurutan:
+                # tab berikutnya sudah (hampir) selesai dimuat saat gilirannya tiba
+                pages = [open_section(context, section) for section in batch]
+                for page, section in zip(pages, batch):
+                    try:
+                        all_articles.extend(scrape_section(page, section))
+                    except PWError as e:
+                        # Satu tab bermasalah tidak menggagalkan section lain
+                        logger.error(f"[{section['name']}] Gagal scrape: {e}")
+            finally:
+                context.close()
 
         browser.close()
 
@@ -226,8 +280,7 @@ def main():
         "articles": unique
     }
 
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-        json.dump(output, f, ensure_ascii=False, indent=2)
+    write_json(OUTPUT_FILE, output)
 
     abs_path = os.path.abspath(OUTPUT_FILE)
     print("\n" + "="*65)
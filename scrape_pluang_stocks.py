@@ -7,23 +7,28 @@ menggunakan parsing Next.js __NEXT_DATA__ SSR tanpa memerlukan browser.
 
 Output: hasil_scrape/pluang_all_stocks_<timestamp>.json
 """
-import requests
-import json
-import re
+import httpx
+import orjson
 import time
+import random
 import os
 import sys
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from json_io import write_json
 
 # --- Konfigurasi ---
 BASE_URL = "https://pluang.com/explore/us-market/stocks"
 TOTAL_PAGES = 64          # Total halaman Pluang (639 saham / 10 per page)
-DELAY_SECONDS = 1.5       # Jeda antar request agar tidak terblokir
+MAX_WORKERS = 8           # Halaman yang di-fetch bersamaan
+REQUEST_JITTER = (0.1, 0.4)  # Jeda acak (detik) per request agar tidak serentak
 OUTPUT_DIR = "hasil_scrape"
 TIMESTAMP = int(time.time())
 OUTPUT_FILE = os.path.join(OUTPUT_DIR, f"pluang_all_stocks_{TIMESTAMP}.json")
 
+NEXT_DATA_TAG = b'<script id="__NEXT_DATA__" type="application/json">'
+
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
@@ -41,14 +46,22 @@ logging.basicConfig(
 )
 logger = logging.getLogger("pluang_stocks")
 
-def extract_next_data(html: str) -> dict | None:
-    """Mengekstrak __NEXT_DATA__ JSON yang disuntikkan Next.js ke dalam HTML."""
-    match = re.search(r'<script id="__NEXT_DATA__" type="application/json">(.*?)</script>', html, re.DOTALL)
-    if match:
-        try:
-            return json.loads(match.group(1))
-        except json.JSONDecodeError as e:
-            logger.warning(f"Gagal parse __NEXT_DATA__: {e}")
+def extract_next_data(content: bytes) -> dict | None:
+    """Mengekstrak __NEXT_DATA__ JSON yang disuntikkan Next.js ke dalam HTML.
+    Tag-nya literal, jadi cukup bytes.find (tanpa regex DOTALL atas seluruh HTML).
+    Bekerja langsung pada resp.content: hanya potongan JSON yang di-decode,
+    tanpa salinan str seluruh halaman dari resp.text."""
+    start = content.find(NEXT_DATA_TAG)
+    if start < 0:
+        return None
+    start += len(NEXT_DATA_TAG)
+    end = content.find(b"</script>", start)
+    if end < 0:
+        return None
+    try:
+        return orjson.loads(content[start:end])
+    except orjson.JSONDecodeError as e:
+        logger.warning(f"Gagal parse __NEXT_DATA__: {e}")
     return None
 
 def parse_stocks_from_next_data(next_data: dict) -> dict:
@@ -94,31 +107,39 @@ def parse_stocks_from_next_data(next_data: dict) -> dict:
         logger.warning(f"Gagal walk pageProps: {e}")
     return stocks
 
-def scrape_page(page_num: int, session: requests.Session) -> dict:
+def scrape_page(page_num: int, client: httpx.Client) -> dict:
     """Mengambil satu halaman dan mengembalikan dictionary saham."""
     url = f"{BASE_URL}?page={page_num}"
+    time.sleep(random.uniform(*REQUEST_JITTER))
     try:
-        resp = session.get(url, headers=HEADERS, timeout=15)
+        resp = client.get(url)
         resp.raise_for_status()
-        next_data = extract_next_data(resp.text)
+        next_data = extract_next_data(resp.content)
         if next_data:
             stocks = parse_stocks_from_next_data(next_data)
             return stocks
         else:
             logger.warning(f"[Page {page_num}] __NEXT_DATA__ tidak ditemukan.")
             return {}
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f"[Page {page_num}] Request gagal: {e}")
         return {}
 
 def main():
     os.makedirs(OUTPUT_DIR, exist_ok=True)
-    session = requests.Session()
+    # HTTP/2: semua worker berbagi (dan me-multiplex) koneksi TLS yang sama
+    client = httpx.Client(
+        http2=True,
+        headers=HEADERS,
+        timeout=15,
+        follow_redirects=True,
+        limits=httpx.Limits(max_connections=MAX_WORKERS * 2, max_keepalive_connections=MAX_WORKERS * 2),
+    )
 
     # Ambil total halaman dari page 1 terlebih dahulu
     logger.info("Mengambil halaman 1 untuk mendapatkan total halaman...")
-    resp = session.get(f"{BASE_URL}?page=1", headers=HEADERS, timeout=15)
-    next_data_p1 = extract_next_data(resp.text)
+    resp = client.get(f"{BASE_URL}?page=1")
+    next_data_p1 = extract_next_data(resp.content)
     total_pages = TOTAL_PAGES
     total_stocks = 639
 
@@ -139,20 +160,19 @@ def main():
     print(f"  🚀 MEMULAI SCRAPING {total_stocks} SAHAM DARI {total_pages} HALAMAN")
     print("="*65 + "\n")
 
-    for page in range(1, total_pages + 1):
-        logger.info(f"Scraping halaman {page}/{total_pages}...")
-        stocks = scrape_page(page, session)
-
-        if stocks:
-            all_stocks.update(stocks)
-            logger.info(f"  ✓ [Page {page}] +{len(stocks)} saham | Total: {len(all_stocks)}")
-        else:
-            failed_pages.append(page)
-            logger.warning(f"  ✗ [Page {page}] Tidak ada data ditemukan.")
-
-        # Jeda antar request
-        if page < total_pages:
-            time.sleep(DELAY_SECONDS)
+    # Fetch paralel; executor.map mengembalikan hasil urut halaman sehingga
+    # urutan saham di output sama dengan crawl sekuensial
+    pages = range(1, total_pages + 1)
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        results = executor.map(lambda page: scrape_page(page, client), pages)
+        for page, stocks in zip(pages, results):
+            if stocks:
+                all_stocks.update(stocks)
+                logger.info(f"  ✓ [Page {page}/{total_pages}] +{len(stocks)} saham | Total: {len(all_stocks)}")
+            else:
+                failed_pages.append(page)
+                logger.warning(f"  ✗ [Page {page}/{total_pages}] Tidak ada data ditemukan.")
+    client.close()
 
     # Simpan hasil
     output = {
@@ -167,8 +187,7 @@ def main():
         "stocks": all_stocks
     }
 
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-        json.dump(output, f, ensure_ascii=False, indent=4)
+    write_json(OUTPUT_FILE, output)
 
     abs_path = os.path.abspath(OUTPUT_FILE)
 
@@ -0,0 +1,107 @@
+"""
+Test --resume scrape_drakorkita setelah run yang crash.
+
+Jalankan: python -m pytest -q test_drakorkita_resume.py
+     atau: python test_drakorkita_resume.py
+"""
+import os
+import tempfile
+import time
+
+import orjson
+
+import scrape_drakorkita as dk
+
+
+def _write(path, data, age=0):
+    with open(path, "wb") as f:
+        f.write(orjson.dumps(data))
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+
+
+def _episodes(n):
+    return [{"episode": str(i), "video_embed": f"https://embed/{i}"} for i in range(1, n + 1)]
+
+
+def test_resume_from_crashed_checkpoint():
+    """Checkpoint (list) run yang crash lebih baru dari file full: dipakai
+    sebagai sumber resume, tanpa membuat --resume crash."""
+    with tempfile.TemporaryDirectory() as tmp:
+        old_dir, dk.OUTPUT_DIR = dk.OUTPUT_DIR, tmp
+        try:
+            _write(os.path.join(tmp, "drakorkita_full_100.json"),
+                   {"metadata": {}, "dramas": [{"url": "https://x/detail/a", "title": "A",
+                                                "episode_embeds": _episodes(2)}]}, age=60)
+            _write(os.path.join(tmp, "drakorkita_full_200.checkpoint.json"),
+                   [{"url": "https://x/detail/b", "title": "B", "episode_embeds": _episodes(3)},
+                    {"url": "https://x/detail/c", "title": "C"}])
+
+            previous = dk._load_previous_details(require_episodes=True)
+            assert list(previous) == ["https://x/detail/b"]
+            previous = dk._load_previous_details(require_episodes=False)
+            assert list(previous) == ["https://x/detail/b", "https://x/detail/c"]
+        finally:
+            dk.OUTPUT_DIR = old_dir
+
+
+def test_resume_prefers_newer_full_file():
+    """Checkpoint lama tertinggal setelah run resume berhasil: file full yang
+    lebih baru menang."""
+    with tempfile.TemporaryDirectory() as tmp:
+        old_dir, dk.OUTPUT_DIR = dk.OUTPUT_DIR, tmp
+        try:
+            _write(os.path.join(tmp, "drakorkita_full_100.checkpoint.json"),
+                   [{"url": "https://x/detail/b", "title": "B"}], age=60)
+            _write(os.path.join(tmp, "drakorkita_full_200.json"),
+                   {"metadata": {}, "dramas": [{"url": "https://x/detail/a", "title": "A"}]})
+            assert list(dk._load_previous_details(require_episodes=False)) == ["https://x/detail/a"]
+        finally:
+            dk.OUTPUT_DIR = old_dir
+
+
+def test_resume_applies_streamed_episodes():
+    """Crash sebelum checkpoint pertama: detail dari .jsonl LANGKAH 2 (baris
+    terakhir terpotong) + episode dari .episodes.jsonl."""
+    with tempfile.TemporaryDirectory() as tmp:
+        old_dir, dk.OUTPUT_DIR = dk.OUTPUT_DIR, tmp
+        try:
+            stem = os.path.join(tmp, "drakorkita_full_300")
+            with open(stem + ".jsonl", "wb") as f:
+                for slug in ("a", "b"):
+                    f.write(orjson.dumps({"url": f"https://x/detail/{slug}", "title": slug}) + b"\n")
+                f.write(b'{"url": "https://x/det')
+            with open(stem + ".episodes.jsonl", "wb") as f:
+                f.write(orjson.dumps({"url": "https://x/detail/b",
+                                      "episode_embeds": _episodes(2)}) + b"\n")
+
+            previous = dk._load_previous_details(require_episodes=True)
+            assert list(previous) == ["https://x/detail/b"]
+            assert previous["https://x/detail/b"]["episode_embeds"] == _episodes(2)
+
+            # Checkpoint menggantikan .jsonl sebagai basis; episode tetap ditimpakan
+            _write(stem + ".checkpoint.json",
+                   [{"url": "https://x/detail/a", "title": "a", "episode_embeds": _episodes(1)},
+                    {"url": "https://x/detail/b", "title": "b"}])
+            previous = dk._load_previous_details(require_episodes=True)
+            assert list(previous) == ["https://x/detail/a", "https://x/detail/b"]
+        finally:
+            dk.OUTPUT_DIR = old_dir
+
+
+def test_resume_skips_non_dict_full_file():
+    with tempfile.TemporaryDirectory() as tmp:
+        old_dir, dk.OUTPUT_DIR = dk.OUTPUT_DIR, tmp
+        try:
+            _write(os.path.join(tmp, "drakorkita_full_100.json"), [1, 2, 3])
+            assert dk._load_previous_details(require_episodes=False) == {}
+        finally:
+            dk.OUTPUT_DIR = old_dir
+
+
+if __name__ == "__main__":
+    test_resume_from_crashed_checkpoint()
+    test_resume_prefers_newer_full_file()
+    test_resume_applies_streamed_episodes()
+    test_resume_skips_non_dict_full_file()
+    print("OK")